@@ -0,0 +1,3 @@
+def schedule(*steps):
+    return tuple(texture for texture, frames in steps for _ in range(frames))
+
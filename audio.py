@@ -0,0 +1,122 @@
+import threading
+import time
+from collections import deque
+
+import arcade
+import pyglet
+
+VOICES = 4
+enabled = True
+owner = None
+pending = deque()
+
+effects = {
+    "extra": ("sounds/extraLife.wav", 0.15, 2),
+    "game_over": ("sounds/GameOver.wav", 0.05, 3),
+    "level": ("sounds/LevelCompleted.wav", 0.15, 3),
+    "energiser": ("sounds/eatEnergiser.wav", 0.15, 1),
+    "fruit": ("sounds/eatfruit.wav", 0.15, 1),
+    "ghost": ("sounds/eatghost.wav", 0.15, 2),
+    "life_lost": ("sounds/lifeLost.wav", 0.15, 3),
+}
+
+MUSIC = "sounds/MazeTune.mp3"
+sounds = {}
+
+
+def sound(name):
+    if name not in sounds:
+        sounds[name] = arcade.load_sound(effects[name][0])
+    return sounds[name]
+
+
+def preload():
+    if enabled:
+        for name in effects:
+            sound(name)
+
+
+class Voice:
+    def __init__(self):
+        self.player = pyglet.media.Player()
+        self.priority = 0
+        self.ends_at = 0.0
+
+    def busy(self, now):
+        return now < self.ends_at
+
+    def start(self, sound, volume, priority, now):
+        self.player.pause()
+        if self.player.source is not None:
+            self.player.next_source()
+        self.player.queue(sound.source)
+        self.player.volume = volume
+        self.player.play()
+        self.priority = priority
+        self.ends_at = now + sound.get_length()
+
+
+class VoicePool:
+    def __init__(self, size=VOICES):
+        self.size = size
+        self.voices = []
+
+    def play(self, sound, volume, priority):
+        if not self.voices:
+            self.voices = [Voice() for _ in range(self.size)]
+        now = time.monotonic()
+        voice = min(self.voices, key=lambda v: (v.busy(now), v.priority, v.ends_at))
+        if voice.busy(now) and voice.priority > priority:
+            return
+        voice.start(sound, volume, priority, now)
+
+
+class MusicPlayer:
+    def __init__(self, path):
+        self.path = path
+        self.player = None
+
+    def play(self, volume=0.33):
+        if self.player is None:
+            self.player = pyglet.media.Player()
+            self.player.loop = True
+            self.player.queue(arcade.load_sound(self.path, streaming=True).source)
+        self.player.seek(0)
+        self.player.volume = volume
+        self.player.play()
+
+    def stop(self):
+        if self.player is not None:
+            self.player.pause()
+
+
+pool = VoicePool()
+music_player = MusicPlayer(MUSIC)
+
+
+def play(name):
+    if enabled:
+        if owner is not None and threading.current_thread() is not owner:
+            pending.append(name)
+            return
+        _, volume, priority = effects[name]
+        pool.play(sound(name), volume, priority)
+
+
+def claim():
+    global owner
+    owner = threading.current_thread()
+
+
+def flush():
+    while pending:
+        play(pending.popleft())
+
+
+def play_music():
+    if enabled:
+        music_player.play()
+
+
+def stop_music():
+    music_player.stop()
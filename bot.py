@@ -0,0 +1,231 @@
+import argparse
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor, wait
+
+import audio
+from constants import FRAME_REFRESH, IN_PLAY, HOLD, LEFT
+from dot import Dot
+from game import Game
+from ghost import Ghost, grid_tile
+from grid import offsets, opposite, tile_exits
+
+BUDGET = 0.008
+DEPTH = 40
+DISCOUNT = 0.95
+DEATH = -100.0
+POWER_STEPS = 25
+
+worker_layouts = None
+worker_models = {}
+
+
+class Model:
+    def __init__(self, exits):
+        self.exits = exits
+        self.min_x = min(x for x, _ in exits)
+        self.max_x = max(x for x, _ in exits)
+
+    def move(self, tile, direction):
+        x, y = tile[0] + offsets[direction][0], tile[1] + offsets[direction][1]
+        if (x, y) not in self.exits:
+            if x < self.min_x:
+                x = self.max_x
+            elif x > self.max_x:
+                x = self.min_x
+            if (x, y) not in self.exits:
+                return tile
+        return x, y
+
+    def chase(self, tile, target, rng):
+        legal = self.exits.get(tile) or (LEFT,)
+        if rng.random() < 0.2:
+            return self.move(tile, rng.choice(legal))
+        return min(
+            (self.move(tile, d) for d in legal),
+            key=lambda t: abs(t[0] - target[0]) + abs(t[1] - target[1]),
+        )
+
+    def rollout(self, state, first, rng, depth=DEPTH):
+        pos, dots, energisers, ghosts = state
+        ghosts = list(ghosts)
+        heading = first
+        pos = self.move(pos, first)
+        eaten = set()
+        power = 0
+        total = 0.0
+        weight = 1.0
+        for _ in range(depth):
+            if pos in dots and pos not in eaten:
+                eaten.add(pos)
+                total += weight
+                if pos in energisers:
+                    total += weight * 4
+                    power = POWER_STEPS
+            for i, (ghost, edible) in enumerate(ghosts):
+                if ghost is None:
+                    continue
+                if ghost != pos:
+                    if edible or power:
+                        legal = self.exits.get(ghost) or (LEFT,)
+                        ghost = self.move(ghost, rng.choice(legal))
+                    else:
+                        ghost = self.chase(ghost, pos, rng)
+                    ghosts[i] = (ghost, edible)
+                if ghost == pos:
+                    if not (edible or power):
+                        return total + weight * DEATH
+                    total += weight * 10
+                    ghosts[i] = (None, False)
+            legal = self.exits.get(pos) or (heading,)
+            options = [d for d in legal if d != opposite[heading]] or legal
+            heading = rng.choice(options)
+            pos = self.move(pos, heading)
+            power = max(0, power - 1)
+            weight *= DISCOUNT
+        return total
+
+    def search(self, state, moves, deadline, seed):
+        rng = random.Random(seed)
+        totals = dict.fromkeys(moves, 0.0)
+        counts = dict.fromkeys(moves, 0)
+        while time.perf_counter() < deadline:
+            for move in moves:
+                totals[move] += self.rollout(state, move, rng)
+                counts[move] += 1
+        return totals, counts
+
+
+def init_worker(layouts):
+    global worker_layouts
+    worker_layouts = layouts
+    audio.enabled = False
+
+
+def worker_search(key, state, moves, budget, seed):
+    model = worker_models.get(key)
+    if model is None:
+        index, height = key
+        model = worker_models[key] = Model(tile_exits(worker_layouts[index], height))
+    return model.search(state, moves, time.perf_counter() + budget, seed)
+
+
+class Autopilot:
+    def __init__(self, budget=BUDGET, workers=0, layouts=None):
+        self.budget = budget
+        self.workers = workers
+        self.pool = None
+        if workers:
+            self.pool = ProcessPoolExecutor(
+                workers, initializer=init_worker, initargs=(layouts,)
+            )
+        self.key = None
+        self.model = None
+        self.tile = None
+        self.direction = HOLD
+        self.seed = 0
+        self.decision_times = []
+
+    def observe(self, game):
+        index = (game.level - 1) % len(game.layouts)
+        key = (index, game.world[1])
+        if key != self.key:
+            self.key = key
+            self.model = Model(tile_exits(game.layouts[index], game.world[1]))
+            self.tile = None
+        dots = set()
+        energisers = set()
+        for dot in game.scene["Dots"]:
+            if not dot.visible:
+                continue
+            tile = grid_tile(dot.center_x, dot.center_y)
+            dots.add(tile)
+            if dot.dtype == Dot.ENERGISER:
+                energisers.add(tile)
+        ghosts = tuple(
+            (grid_tile(g.center_x, g.center_y), g.mode == Ghost.FRIGHTENED)
+            for g in game.scene["Ghosts"]
+            if g.delay <= 0 and g.mode != Ghost.CAUGHT
+        )
+        pacman = grid_tile(game.pacman.center_x, game.pacman.center_y)
+        return pacman, frozenset(dots), frozenset(energisers), ghosts
+
+    def choose(self, game):
+        p = game.pacman
+        tile = grid_tile(p.center_x, p.center_y)
+        if tile == self.tile and self.direction != HOLD:
+            return self.direction
+        start = time.perf_counter()
+        state = self.observe(game)
+        self.tile = tile
+        moves = self.model.exits.get(tile)
+        if not moves:
+            return self.direction
+        if len(moves) == 1:
+            self.direction = moves[0]
+        else:
+            totals, counts = self.search(state, moves, start + self.budget)
+            self.direction = max(moves, key=lambda m: totals[m] / max(counts[m], 1))
+        self.decision_times.append(time.perf_counter() - start)
+        return self.direction
+
+    def search(self, state, moves, deadline):
+        self.seed += 1
+        if self.pool is None:
+            return self.model.search(state, moves, deadline, self.seed)
+        budget = deadline - time.perf_counter()
+        work = budget * 0.75
+        futures = [
+            self.pool.submit(
+                worker_search, self.key, state, moves, work, self.seed * 64 + i
+            )
+            for i in range(self.workers)
+        ]
+        done, _ = wait(futures, timeout=budget)
+        totals = dict.fromkeys(moves, 0.0)
+        counts = dict.fromkeys(moves, 0)
+        for future in done:
+            t, c = future.result()
+            for move in moves:
+                totals[move] += t[move]
+                counts[move] += c[move]
+        return totals, counts
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.shutdown(cancel_futures=True)
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--games", type=int, default=3)
+    parser.add_argument("--budget", type=float, default=BUDGET)
+    parser.add_argument("--workers", type=int, default=0)
+    parser.add_argument("--max-frames", type=int, default=FRAME_REFRESH * 600)
+    args = parser.parse_args()
+    audio.enabled = False
+    game = Game()
+    bot = Autopilot(args.budget, args.workers, game.layouts)
+    for n in range(args.games):
+        game.start()
+        while game.game_state == IN_PLAY and game.frame < args.max_frames:
+            game.steer(bot.choose(game))
+            game.step()
+        print(f"game {n + 1}: score {game.score} level {game.level}")
+    bot.close()
+    times = bot.decision_times
+    frame = 1 / FRAME_REFRESH
+    print(
+        f"{len(times)} decisions, p50 {percentile(times, 0.5) * 1000:.2f} ms, "
+        f"p99 {percentile(times, 0.99) * 1000:.2f} ms, "
+        f"over one frame {sum(t > frame for t in times)}"
+    )
+
+
+if __name__ == "__main__":
+    main()
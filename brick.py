@@ -1,6 +1,7 @@
 import arcade
 
 from constants import WINDOW_HEIGHT
+from grid import tile_position
 
 
 class Brick(arcade.Sprite):
@@ -14,11 +15,15 @@ class Brick(arcade.Sprite):
     BRICK = 1
     OPENING = 4
 
-    def __init__(self, element, x, y):
-        image = Brick.brick_image[element]
-        x = x * 20 + 20
-        y = WINDOW_HEIGHT - (y * 20 + 40)
-        super().__init__(image, 1, x, y)
+    def __init__(self, element, x, y, height=WINDOW_HEIGHT):
+        super().__init__(Brick.brick_image[element], 1)
+        self.reset(element, x, y, height)
+
+    def reset(self, element, x, y, height=WINDOW_HEIGHT):
+        self.position = tile_position(x, y, height)
+        if self.texture is not Brick.brick_image[element]:
+            self.texture = Brick.brick_image[element]
+            self.sync_hit_box_to_texture()
         if element < 4:
             self.type = Brick.BRICK
         else:
@@ -0,0 +1,39 @@
+import arcade
+
+from constants import GRID_WIDTH
+
+CHUNK_TILES = 16
+
+
+class ChunkedLayer:
+    def __init__(self, size=CHUNK_TILES * GRID_WIDTH):
+        self.size = size
+        self.chunks = {}
+
+    def key(self, x, y):
+        return int(x // self.size), int(y // self.size)
+
+    def add(self, sprite):
+        key = self.key(sprite.center_x, sprite.center_y)
+        chunk = self.chunks.get(key)
+        if chunk is None:
+            chunk = self.chunks[key] = arcade.SpriteList(lazy=True)
+        chunk.append(sprite)
+
+    def region(self, left, bottom, right, top):
+        x0, y0 = self.key(left, bottom)
+        x1, y1 = self.key(right, top)
+        for cx in range(x0, x1 + 1):
+            for cy in range(y0, y1 + 1):
+                chunk = self.chunks.get((cx, cy))
+                if chunk:
+                    yield chunk
+
+    def around(self, x, y):
+        return self.region(
+            x - GRID_WIDTH, y - GRID_WIDTH, x + GRID_WIDTH, y + GRID_WIDTH
+        )
+
+    def draw(self, left, bottom, right, top):
+        for chunk in self.region(left, bottom, right, top):
+            chunk.draw()
@@ -0,0 +1,288 @@
+import argparse
+import asyncio
+import itertools
+import json
+import multiprocessing
+import random
+import socket
+import time
+from collections import deque
+
+import audio
+from bot import Autopilot
+from constants import FRAME_REFRESH, IN_PLAY, LEFT, RIGHT, UP, DOWN
+from game import TUNING, Game
+
+LEASE = 120.0
+PREFETCH = 2
+RETRY = 10.0
+
+
+def encode(message):
+    return (json.dumps(message, separators=(",", ":")) + "\n").encode()
+
+
+def plan(seeds, overrides, frames, swarm=0, scale=1, bot=0.0):
+    names = list(overrides)
+    jobs = []
+    for values in itertools.product(*(overrides[n] for n in names)):
+        tuning = dict(zip(names, values))
+        for seed in seeds:
+            jobs.append(
+                {
+                    "id": len(jobs),
+                    "seed": seed,
+                    "frames": frames,
+                    "swarm": swarm,
+                    "scale": scale,
+                    "bot": bot,
+                    "tuning": tuning,
+                }
+            )
+    return jobs
+
+
+def run_job(job):
+    started = time.perf_counter()
+    game = Game(job["swarm"], job["scale"], tuning=job["tuning"])
+    game.start(job["seed"])
+    pilot = Autopilot(job["bot"], 0, game.layouts) if job["bot"] else None
+    script = random.Random(job["seed"])
+    while game.game_state == IN_PLAY and game.frame < job["frames"]:
+        if pilot is not None:
+            game.steer(pilot.choose(game))
+        elif game.frame % 8 == 0:
+            game.steer(script.choice((LEFT, RIGHT, UP, DOWN)))
+        game.step()
+    return {
+        "id": job["id"],
+        "seed": job["seed"],
+        "tuning": job["tuning"],
+        "score": game.score,
+        "level": game.level,
+        "lives": game.lives,
+        "frames": game.frame,
+        "ghosts": len(game.ghost_scores),
+        "seconds": round(time.perf_counter() - started, 3),
+    }
+
+
+class Coordinator:
+    def __init__(self, jobs, out=None, lease=LEASE):
+        self.jobs = {job["id"]: job for job in jobs}
+        self.pending = deque(jobs)
+        self.leases = {}
+        self.results = {}
+        self.out = out
+        self.lease = lease
+        self.waiting = {}
+        self.workers = 0
+        self.reassigned = 0
+        self.finished = asyncio.Event()
+        if not jobs:
+            self.finished.set()
+
+    def complete(self, result):
+        job_id = result["id"]
+        if job_id in self.results or job_id not in self.jobs:
+            return
+        self.results[job_id] = result
+        self.leases.pop(job_id, None)
+        if self.out is not None:
+            self.out.write(json.dumps(result) + "\n")
+            self.out.flush()
+        if len(self.results) == len(self.jobs):
+            self.finished.set()
+            for writer in self.waiting:
+                writer.write(encode({"done": True}))
+
+    def requeue(self, job_ids, owner=None):
+        for job_id in job_ids:
+            lease = self.leases.get(job_id)
+            if lease is not None and owner in (None, lease[0]):
+                del self.leases[job_id]
+                self.pending.appendleft(self.jobs[job_id])
+                self.reassigned += 1
+
+    def dispatch(self):
+        for writer, (held, credit) in list(self.waiting.items()):
+            while credit and self.pending:
+                job = self.pending.popleft()
+                if job["id"] in self.results:
+                    continue
+                held.add(job["id"])
+                self.leases[job["id"]] = (writer, time.monotonic() + self.lease)
+                writer.write(encode({"job": job}))
+                credit -= 1
+            self.waiting[writer] = (held, credit)
+
+    async def handle(self, reader, writer):
+        held = set()
+        self.waiting[writer] = (held, 0)
+        self.workers += 1
+        try:
+            while line := await reader.readline():
+                message = json.loads(line)
+                if "result" in message:
+                    held.discard(message["result"]["id"])
+                    self.complete(message["result"])
+                if self.finished.is_set():
+                    writer.write(encode({"done": True}))
+                    break
+                _, credit = self.waiting[writer]
+                self.waiting[writer] = (held, credit + message.get("take", 0))
+                self.dispatch()
+                await writer.drain()
+        except (ConnectionError, ValueError, KeyError):
+            pass
+        finally:
+            del self.waiting[writer]
+            self.workers -= 1
+            self.requeue(held, writer)
+            self.dispatch()
+            writer.close()
+
+    async def expire(self):
+        while not self.finished.is_set():
+            await asyncio.sleep(1)
+            now = time.monotonic()
+            late = [i for i, (_, until) in self.leases.items() if until < now]
+            if late:
+                self.requeue(late)
+                self.dispatch()
+
+    async def serve(self, host, port):
+        server = await asyncio.start_server(self.handle, host, port)
+        async with server:
+            expiry = asyncio.create_task(self.expire())
+            await self.finished.wait()
+            expiry.cancel()
+            for writer in list(self.waiting):
+                writer.close()
+            await asyncio.sleep(0.1)
+
+
+def connect(host, port, retry=RETRY):
+    deadline = time.monotonic() + retry
+    while True:
+        try:
+            return socket.create_connection((host, port))
+        except OSError:
+            if time.monotonic() > deadline:
+                raise
+            time.sleep(0.2)
+
+
+def work(host, port, prefetch=PREFETCH):
+    audio.enabled = False
+    done = 0
+    with connect(host, port) as sock:
+        stream = sock.makefile("rwb")
+        try:
+            stream.write(encode({"take": prefetch}))
+            stream.flush()
+            while line := stream.readline():
+                message = json.loads(line)
+                if message.get("done"):
+                    break
+                stream.write(encode({"result": run_job(message["job"]), "take": 1}))
+                stream.flush()
+                done += 1
+        except ConnectionError:
+            pass
+    return done
+
+
+def spawn(host, port, processes, prefetch=PREFETCH):
+    workers = [
+        multiprocessing.Process(target=work, args=(host, port, prefetch), daemon=True)
+        for _ in range(processes)
+    ]
+    for worker in workers:
+        worker.start()
+    return workers
+
+
+def parse_override(text):
+    name, _, values = text.partition("=")
+    if name not in TUNING or not values:
+        raise argparse.ArgumentTypeError(
+            f"expected NAME=V[,V...] with NAME one of {', '.join(TUNING)}"
+        )
+    values = [int(v) for v in values.split(",")]
+    for v in values:
+        if name.endswith("_speed") and not 0 <= v <= 100:
+            raise argparse.ArgumentTypeError(f"{name} is a percentage, got {v}")
+        if not name.endswith("_speed") and v < 1:
+            raise argparse.ArgumentTypeError(f"{name} must be positive, got {v}")
+    return name, values
+
+
+def summarise(coordinator, elapsed):
+    results = coordinator.results.values()
+    print(
+        f"{len(results)} jobs in {elapsed:.1f} s, {len(results) / elapsed:.2f} jobs/s,"
+        f" {sum(r['frames'] for r in results) / elapsed / FRAME_REFRESH:.0f}x"
+        f" real time, {coordinator.reassigned} reassigned"
+    )
+    groups = {}
+    for r in results:
+        groups.setdefault(json.dumps(r["tuning"], sort_keys=True), []).append(r)
+    for tuning, group in sorted(groups.items()):
+        scores = [r["score"] for r in group]
+        levels = [r["level"] for r in group]
+        print(
+            f"{tuning}: mean score {sum(scores) / len(scores):.0f}"
+            f"  mean level {sum(levels) / len(levels):.2f}  games {len(group)}"
+        )
+
+
+async def coordinate(args, jobs):
+    out = open(args.out, "a") if args.out else None
+    coordinator = Coordinator(jobs, out, args.lease)
+    started = time.perf_counter()
+    workers = []
+    if args.command == "local":
+        workers = spawn(args.host, args.port, args.workers, args.prefetch)
+    await coordinator.serve(args.host, args.port)
+    elapsed = time.perf_counter() - started
+    for worker in workers:
+        worker.join(5)
+    if out is not None:
+        out.close()
+    summarise(coordinator, elapsed)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("command", choices=("coordinate", "local", "work"))
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8766)
+    parser.add_argument("--workers", type=int, default=multiprocessing.cpu_count())
+    parser.add_argument("--prefetch", type=int, default=PREFETCH)
+    parser.add_argument("--seeds", type=int, default=16)
+    parser.add_argument("--first-seed", type=int, default=0)
+    parser.add_argument("--frames", type=int, default=FRAME_REFRESH * 300)
+    parser.add_argument("--swarm", type=int, default=0)
+    parser.add_argument("--scale", type=int, default=1)
+    parser.add_argument("--bot", type=float, default=0.0, metavar="BUDGET")
+    parser.add_argument(
+        "--set", type=parse_override, action="append", default=[], metavar="NAME=V,V"
+    )
+    parser.add_argument("--lease", type=float, default=LEASE, metavar="SECONDS")
+    parser.add_argument("--out", metavar="PATH")
+    args = parser.parse_args()
+    audio.enabled = False
+
+    if args.command == "work":
+        workers = spawn(args.host, args.port, args.workers, args.prefetch)
+        for worker in workers:
+            worker.join()
+        return
+    seeds = range(args.first_seed, args.first_seed + args.seeds)
+    jobs = plan(seeds, dict(args.set), args.frames, args.swarm, args.scale, args.bot)
+    asyncio.run(coordinate(args, jobs))
+
+
+if __name__ == "__main__":
+    main()
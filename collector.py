@@ -0,0 +1,95 @@
+import gc
+import sys
+import time
+from collections import Counter, deque
+
+POLICIES = ("default", "deferred")
+DEFERRED = 1 << 30
+
+
+class Collector:
+    def __init__(self, policy="default", size=600):
+        self.policy = policy
+        self.threshold = gc.get_threshold()
+        self.growth = deque(maxlen=size)
+        self.blocks = sys.getallocatedblocks()
+        self.frames = 0
+        self.pauses = deque(maxlen=size)
+        self.collections = Counter()
+        self.started = 0.0
+        self.settling = False
+        self.collected = False
+        self.settles = 0
+        gc.callbacks.append(self.observe)
+        if policy == "deferred":
+            gc.set_threshold(self.threshold[0], self.threshold[1], DEFERRED)
+
+    def observe(self, phase, info):
+        if self.settling:
+            return
+        if phase == "start":
+            self.started = time.perf_counter()
+        else:
+            self.collections[info["generation"]] += 1
+            self.pauses.append(time.perf_counter() - self.started)
+
+    def tick(self):
+        blocks = sys.getallocatedblocks()
+        self.growth.append(blocks - self.blocks)
+        self.blocks = blocks
+        self.frames += 1
+
+    def collect(self):
+        if self.policy != "deferred":
+            return
+        self.settling = True
+        gc.unfreeze()
+        gc.collect()
+        self.settling = False
+        self.collected = True
+        self.blocks = sys.getallocatedblocks()
+
+    def settle(self):
+        if self.policy != "deferred":
+            return
+        if not self.collected:
+            self.collect()
+        gc.freeze()
+        self.collected = False
+        self.settles += 1
+
+    def close(self):
+        gc.callbacks.remove(self.observe)
+        gc.set_threshold(*self.threshold)
+        gc.unfreeze()
+
+    def summary(self):
+        growth = self.growth
+        mean = sum(growth) / len(growth) if growth else 0.0
+        worst = max(self.pauses, default=0.0) * 1000
+        return (
+            f"gc {self.policy}  blocks/frame {mean:+.0f}"
+            f"  collections {sum(self.collections.values())}  worst {worst:.1f} ms"
+        )
+
+    def report(self):
+        growth = sorted(self.growth)
+        lines = [f"gc policy: {self.policy}  frames: {self.frames}"]
+        if growth:
+            lines.append(
+                f"blocks/frame: mean {sum(growth) / len(growth):+.1f}"
+                f"  p99 {growth[min(len(growth) - 1, int(len(growth) * 0.99))]:+d}"
+                f"  max {growth[-1]:+d}"
+            )
+        for generation, count in sorted(self.collections.items()):
+            lines.append(f"generation {generation}: {count} collections in play")
+        if self.pauses:
+            lines.append(
+                f"pauses ms: max {max(self.pauses) * 1000:.2f}"
+                f"  total {sum(self.pauses) * 1000:.1f}"
+            )
+        lines.append(
+            f"settled at {self.settles} transitions"
+            f"  frozen objects {gc.get_freeze_count()}"
+        )
+        return lines
@@ -0,0 +1,166 @@
+import argparse
+import json
+import os
+
+import numpy as np
+
+import telemetry
+from maze_grids import maze_layouts
+
+FORMAT = 2
+
+
+def event_dtype(level):
+    return np.dtype(
+        [
+            ("kind", "u1"),
+            ("level", level),
+            ("frame", "<u4"),
+            ("x", "<i2"),
+            ("y", "<i2"),
+            ("value", "<i4"),
+        ]
+    )
+
+
+events = event_dtype("<u2")
+layouts = {b"PACTEL1\n": event_dtype("u1"), telemetry.HEADER: events}
+columns = {
+    "session": np.dtype("<u4"),
+    "maze": np.dtype("u1"),
+    **{name: events.fields[name][0] for name in events.names},
+}
+kinds = {
+    "deaths": telemetry.CAUGHT,
+    "catches": telemetry.GHOST_EATEN,
+    "dots": telemetry.DOT,
+    "fruit": telemetry.FRUIT,
+}
+
+
+class Corpus:
+    def __init__(self, directory):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+        self.meta_path = os.path.join(directory, "meta.json")
+        self.meta = {"rows": 0, "sessions": []}
+        if os.path.exists(self.meta_path):
+            with open(self.meta_path) as f:
+                self.meta = json.load(f)
+            if self.meta["rows"] and self.meta.get("format") != FORMAT:
+                raise ValueError(f"{directory} uses an older layout, rebuild it")
+        self.meta["format"] = FORMAT
+        self.maps = {}
+
+    def column_path(self, name):
+        return os.path.join(self.directory, f"{name}.bin")
+
+    def ingest(self, path):
+        with open(path, "rb") as f:
+            layout = layouts.get(f.read(len(telemetry.HEADER)))
+            if layout is None:
+                raise ValueError(f"{path} is not a telemetry file")
+            data = f.read()
+        data = data[: len(data) - len(data) % layout.itemsize]
+        batch = np.frombuffer(data, dtype=layout)
+        session = len(self.meta["sessions"])
+        values = {
+            "session": np.full(len(batch), session, dtype=columns["session"]),
+            "maze": ((batch["level"].astype(np.int16) - 1) % len(maze_layouts)).astype(
+                columns["maze"]
+            ),
+        }
+        for name in events.names:
+            values[name] = batch[name]
+        for name, dtype in columns.items():
+            with open(self.column_path(name), "ab") as f:
+                f.write(np.ascontiguousarray(values[name], dtype=dtype).tobytes())
+        self.meta["rows"] += len(batch)
+        self.meta["sessions"].append(os.path.basename(path))
+        tmp = self.meta_path + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump(self.meta, f)
+        os.replace(tmp, self.meta_path)
+        self.maps.clear()
+        return len(batch)
+
+    def column(self, name):
+        array = self.maps.get(name)
+        if array is None:
+            if not self.meta["rows"]:
+                return np.empty(0, dtype=columns[name])
+            array = np.memmap(
+                self.column_path(name),
+                dtype=columns[name],
+                mode="r",
+                shape=(self.meta["rows"],),
+            )
+            self.maps[name] = array
+        return array
+
+    def heatmap(self, kind, maze):
+        layout = maze_layouts[maze]
+        mask = (self.column("kind") == kind) & (self.column("maze") == maze)
+        x = self.column("x")[mask].astype(np.int64)
+        y = self.column("y")[mask].astype(np.int64)
+        width = max(len(layout[0]), int(x.max()) + 1 if len(x) else 0)
+        height = max(len(layout), int(y.max()) + 1 if len(y) else 0)
+        inside = (x >= 0) & (y >= 0)
+        counts = np.bincount(
+            y[inside] * width + x[inside], minlength=width * height
+        )
+        return counts.reshape(height, width)
+
+    def clear_times(self, maze=None):
+        mask = self.column("kind") == telemetry.LEVEL_CLEARED
+        if maze is not None:
+            mask &= self.column("maze") == maze
+        return self.column("value")[mask]
+
+
+def show_heatmap(grid, layout):
+    shades = " .:-=+*#%@"
+    peak = grid.max() or 1
+    for y, row in enumerate(grid):
+        line = []
+        for x, count in enumerate(row):
+            if count:
+                line.append(shades[1 + int(count * (len(shades) - 2) / peak)])
+            elif y < len(layout) and x < len(layout[y]) and layout[y][x] == "X":
+                line.append("X")
+            else:
+                line.append(" ")
+        print("".join(line))
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("corpus")
+    sub = parser.add_subparsers(dest="command", required=True)
+    ingest = sub.add_parser("ingest")
+    ingest.add_argument("files", nargs="+")
+    heat = sub.add_parser("heatmap")
+    heat.add_argument("kind", choices=kinds)
+    heat.add_argument("--maze", type=int, default=0)
+    clear = sub.add_parser("clear-times")
+    clear.add_argument("--maze", type=int)
+    args = parser.parse_args()
+    corpus = Corpus(args.corpus)
+    if args.command == "ingest":
+        for path in args.files:
+            print(f"{path}: {corpus.ingest(path)} events")
+    elif args.command == "heatmap":
+        grid = corpus.heatmap(kinds[args.kind], args.maze)
+        show_heatmap(grid, maze_layouts[args.maze])
+        print(f"{grid.sum()} {args.kind}")
+    else:
+        times = corpus.clear_times(args.maze)
+        if len(times):
+            seconds = times / 60
+            for q in (0.1, 0.5, 0.9):
+                print(f"p{int(q * 100)} {np.quantile(seconds, q):.1f} s")
+        print(f"{len(times)} levels cleared")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+import struct
+
+from state import State
+
+KEYFRAME = 0
+DELTA = 1
+KEYFRAME_INTERVAL = 300
+
+PACMAN = 1
+COUNTERS = 2
+GHOSTS = 4
+DOTS = 8
+
+header = struct.Struct("<BI")
+counters = struct.Struct("<iBHB")
+actor = struct.Struct("<ffBB")
+ghost_entry = struct.Struct("<HffBB")
+count = struct.Struct("<H")
+record = struct.Struct("<I")
+
+
+def pack_actor(a):
+    return actor.pack(a[0], a[1], a[2], a[3])
+
+
+class StateEncoder:
+    def __init__(self, keyframe_interval=KEYFRAME_INTERVAL):
+        self.keyframe_interval = keyframe_interval
+        self.last = None
+        self.since_keyframe = 0
+
+    def needs_keyframe(self, state):
+        last = self.last
+        return (
+            last is None
+            or self.since_keyframe >= self.keyframe_interval
+            or len(state.ghosts) != len(last.ghosts)
+            or len(state.dots) != len(last.dots)
+            or state.level != last.level
+            or any(a < b for a, b in zip(last.dots, state.dots))
+        )
+
+    def encode(self, state):
+        if self.needs_keyframe(state):
+            data = self.keyframe(state)
+            self.since_keyframe = 0
+        else:
+            data = self.delta(state)
+            self.since_keyframe += 1
+        self.last = state
+        return data
+
+    def keyframe(self, state):
+        parts = [
+            header.pack(KEYFRAME, state.frame),
+            counters.pack(state.score, state.lives, state.level, state.state),
+            pack_actor(state.pacman),
+            count.pack(len(state.ghosts)),
+        ]
+        parts.extend(pack_actor(g) for g in state.ghosts)
+        parts.append(count.pack(len(state.dots)))
+        parts.append(state.dots)
+        return b"".join(parts)
+
+    def delta(self, state):
+        last = self.last
+        flags = 0
+        parts = []
+        if state.pacman != last.pacman:
+            flags |= PACMAN
+            parts.append(pack_actor(state.pacman))
+        if (state.score, state.lives, state.state) != (
+            last.score,
+            last.lives,
+            last.state,
+        ):
+            flags |= COUNTERS
+            parts.append(
+                counters.pack(state.score, state.lives, state.level, state.state)
+            )
+        moved = [
+            (i, g) for i, (g, h) in enumerate(zip(state.ghosts, last.ghosts)) if g != h
+        ]
+        if moved:
+            flags |= GHOSTS
+            parts.append(count.pack(len(moved)))
+            parts.extend(ghost_entry.pack(i, *g) for i, g in moved)
+        if state.dots != last.dots:
+            eaten = [
+                i for i, (a, b) in enumerate(zip(last.dots, state.dots)) if a and not b
+            ]
+            flags |= DOTS
+            parts.append(count.pack(len(eaten)))
+            parts.append(struct.pack(f"<{len(eaten)}H", *eaten))
+        return header.pack(DELTA, state.frame) + bytes((flags,)) + b"".join(parts)
+
+
+class StateDecoder:
+    def __init__(self):
+        self.state = None
+
+    def decode(self, data):
+        kind, frame = header.unpack_from(data)
+        offset = header.size
+        if kind == KEYFRAME:
+            score, lives, level, game_state = counters.unpack_from(data, offset)
+            offset += counters.size
+            pacman = actor.unpack_from(data, offset)
+            offset += actor.size
+            (n,) = count.unpack_from(data, offset)
+            offset += count.size
+            ghosts = []
+            for _ in range(n):
+                ghosts.append(actor.unpack_from(data, offset))
+                offset += actor.size
+            (n,) = count.unpack_from(data, offset)
+            offset += count.size
+            dots = bytes(data[offset : offset + n])
+            self.state = State(
+                frame,
+                game_state,
+                score,
+                lives,
+                level,
+                pacman,
+                tuple(ghosts),
+                dots,
+            )
+            return self.state
+        if self.state is None:
+            raise ValueError("delta received before the first keyframe")
+        s = self.state
+        flags = data[offset]
+        offset += 1
+        pacman = s.pacman
+        score, lives, level, game_state = s.score, s.lives, s.level, s.state
+        ghosts = s.ghosts
+        dots = s.dots
+        if flags & PACMAN:
+            pacman = actor.unpack_from(data, offset)
+            offset += actor.size
+        if flags & COUNTERS:
+            score, lives, level, game_state = counters.unpack_from(data, offset)
+            offset += counters.size
+        if flags & GHOSTS:
+            (n,) = count.unpack_from(data, offset)
+            offset += count.size
+            ghosts = list(ghosts)
+            for _ in range(n):
+                i, *g = ghost_entry.unpack_from(data, offset)
+                ghosts[i] = tuple(g)
+                offset += ghost_entry.size
+            ghosts = tuple(ghosts)
+        if flags & DOTS:
+            (n,) = count.unpack_from(data, offset)
+            offset += count.size
+            dots = bytearray(dots)
+            for i in struct.unpack_from(f"<{n}H", data, offset):
+                dots[i] = 0
+            dots = bytes(dots)
+        self.state = State(frame, game_state, score, lives, level, pacman, ghosts, dots)
+        return self.state
+
+
+def write_record(f, data):
+    f.write(record.pack(len(data)))
+    f.write(data)
+
+
+def read_records(f):
+    while size := f.read(record.size):
+        (n,) = record.unpack(size)
+        yield f.read(n)
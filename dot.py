@@ -1,6 +1,7 @@
 import arcade
 
 from constants import WINDOW_HEIGHT, DISPLAY_FRUIT
+from grid import tile_position
 
 
 class Dot(arcade.Sprite):
@@ -22,14 +23,19 @@ class Dot(arcade.Sprite):
 
     fruit_score = [100, 300, 500, 700, 1000, 2000, 3000, 5000]
 
-    def __init__(self, dtype, x, y, fruit_number=1):
+    def __init__(self, dtype, x, y, fruit_number=1, height=WINDOW_HEIGHT):
+        super().__init__(Dot.dot_image, 1)
+        self.reset(dtype, x, y, fruit_number, height)
+
+    def reset(self, dtype, x, y, fruit_number=1, height=WINDOW_HEIGHT):
         self.dtype = dtype
-        x = x * 20 + 20
-        y = WINDOW_HEIGHT - (y * 20 + 40)
+        x, y = tile_position(x, y, height)
         self.timer = 0
 
         image = None
         self.done = False
+        self.visible = True
+        self.index = -1
         match dtype:
             case Dot.DOT:
                 image = Dot.dot_image
@@ -44,7 +50,10 @@ class Dot(arcade.Sprite):
                 self.score = Dot.fruit_score[fruit_number - 1]
                 self.timer = DISPLAY_FRUIT
                 x = x - 10
-        super().__init__(image, 1, x, y)
+        self.position = (x, y)
+        if self.texture is not image:
+            self.texture = image
+            self.sync_hit_box_to_texture()
 
     def update(self, delta_time):
         if self.dtype == Dot.FRUIT:
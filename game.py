@@ -0,0 +1,636 @@
+import math
+import random
+from functools import partial
+
+import arcade
+
+import audio
+import telemetry
+from brick import Brick
+from chunks import ChunkedLayer
+from constants import (
+    WINDOW_WIDTH,
+    WINDOW_HEIGHT,
+    START_LIVES,
+    PAUSED,
+    IN_PLAY,
+    GAME_OVER,
+    END_OF_LEVEL_DELAY,
+    FRAME_REFRESH,
+    GRID_WIDTH,
+    CHASE_TIMER,
+    SCATTER_TIMER,
+    FRIGHT_TIMER,
+    NEW_LIFE_INTERVAL,
+    HOLD,
+    LEFT,
+    RIGHT,
+    UP,
+    DOWN,
+    WHITE,
+    RED,
+    SCORE_FONT_SIZE,
+    INST_FONT_SIZE,
+)
+from dot import Dot
+from ghost import Ghost, ghost_score, grid_tile
+from grid import offsets, opposite, tile_exits, world_size
+from maze_grids import maze_layouts, scale_layout
+from pac_man import PacMan
+from pool import SpritePool
+from state import State
+from swarm import Swarm
+
+event_for_dot = {
+    Dot.DOT: telemetry.DOT,
+    Dot.ENERGISER: telemetry.ENERGISER,
+    Dot.FRUIT: telemetry.FRUIT,
+}
+
+TUNING = {
+    "chase_timer": CHASE_TIMER,
+    "scatter_timer": SCATTER_TIMER,
+    "fright_timer": FRIGHT_TIMER,
+    "pacman_speed": 100,
+    "ghost_speed": 100,
+}
+
+LAYERS = ("Lives", "Grid", "Dots", "Bonus", "Fruit", "Ghosts", "Pacman")
+MOVING = ("Bonus", "Ghosts", "Pacman")
+LEVEL_LISTS = ("Grid", "Dots", "Ghosts")
+
+
+class StagedLevel:
+    def __init__(self, level, layouts, swarm_size=0, rng=random, pool=None):
+        self.level = level
+        self.rng = rng
+        self.pool = pool or SpritePool()
+        self.sprites = []
+        self.index = (level - 1) % len(layouts)
+        self.layout = layouts[self.index]
+        self.swarm_size = swarm_size
+        self.world = world_size(self.layout)
+        self.grid = self.pool.sprite_list(True)
+        self.dots = self.pool.sprite_list()
+        self.ghosts = self.pool.sprite_list(swarm_size > 0)
+        self.layers = None
+        if self.world[0] > WINDOW_WIDTH or self.world[1] > WINDOW_HEIGHT:
+            self.layers = {"Grid": ChunkedLayer(), "Dots": ChunkedLayer()}
+        self.dot_map = bytearray()
+        self.pacman = None
+        self.fruit_position = (0, 0)
+        self.exit_point = ()
+        self.exits = {}
+        self.swarm = None
+        self.rows_per_step = max(1, -(-len(self.layout) // (END_OF_LEVEL_DELAY // 2)))
+        self.rows = self.build()
+
+    def take(self, kind, *args):
+        sprite = self.pool.take(kind, *args)
+        self.sprites.append(sprite)
+        return sprite
+
+    def add_tile(self, sprite_list, name, sprite):
+        sprite_list.append(sprite)
+        if self.layers is not None:
+            self.layers[name].add(sprite)
+
+    def add_dot(self, dtype, x, y):
+        dot = self.take(Dot, dtype, x, y, 1, self.world[1])
+        dot.index = len(self.dot_map)
+        self.dot_map.append(1)
+        self.add_tile(self.dots, "Dots", dot)
+
+    def add_ghost(self, gtype, x, y):
+        ghost = self.take(Ghost, gtype, x, y, *self.world)
+        if gtype == Ghost.BLINKY:
+            self.exit_point = Ghost.ghost_exit_point
+        self.ghosts.append(ghost)
+
+    def build(self):
+        width, height = self.world
+        for y, row in enumerate(self.layout):
+            for x, c in enumerate(row):
+                if c == "X":
+                    brick = self.take(Brick, self.index, x, y, height)
+                    self.add_tile(self.grid, "Grid", brick)
+                elif c == "O":
+                    brick = self.take(Brick, Brick.OPENING, x, y, height)
+                    self.add_tile(self.grid, "Grid", brick)
+                elif c == "Y":
+                    self.pacman = self.take(PacMan, x, y, height)
+                elif c == ".":
+                    self.add_dot(Dot.DOT, x, y)
+                elif c == "E":
+                    self.add_dot(Dot.ENERGISER, x, y)
+                elif c == "F":
+                    self.fruit_position = (x, y)
+                elif c == "B":
+                    self.add_ghost(Ghost.BLINKY, x, y)
+                elif c == "I":
+                    self.add_ghost(Ghost.INKY, x, y)
+                elif c == "P":
+                    self.add_ghost(Ghost.PINKY, x, y)
+                elif c == "C":
+                    self.add_ghost(Ghost.CLYDE, x, y)
+            yield
+        self.exits = tile_exits(self.layout, height)
+        if self.swarm_size:
+            self.swarm = Swarm(self.layout, self.world)
+            start = grid_tile(self.pacman.center_x, self.pacman.center_y)
+            spawned = self.swarm.spawn(
+                self.swarm_size, start, self.rng, partial(self.take, Ghost)
+            )
+            self.ghosts.extend(spawned)
+            yield
+
+    def advance(self):
+        for _ in range(self.rows_per_step):
+            if next(self.rows, True):
+                break
+
+    def finish(self):
+        for _ in self.rows:
+            pass
+
+
+class Game:
+    def __init__(self, swarm=0, scale=1, cornering=0, seed=None, tuning=None):
+        self.swarm_size = swarm
+        self.scaling = scale
+        self.cornering = cornering
+        self.seed = seed
+        self.tuning = {**TUNING, **(tuning or {})}
+        self.rng = random.Random(seed)
+        self.inputs = []
+        self.ghost_scores = []
+        self.swarm = None
+        self.layouts = maze_layouts
+        if scale > 1:
+            self.layouts = [scale_layout(m, scale, scale) for m in maze_layouts]
+        self.world = (WINDOW_WIDTH, WINDOW_HEIGHT)
+        self.layers = None
+        self.scene = arcade.Scene()
+        for name in LAYERS:
+            self.scene.add_sprite_list(name, sprite_list=arcade.SpriteList(lazy=True))
+
+        self.pacman = None
+        self.pool = SpritePool()
+        self.level_sprites = []
+        self.generation = 0
+        self.staged = None
+        self.telemetry = None
+        self.live_state = None
+        self.fruit_position = (0, 0)
+        self.exit_point = ()
+        self.exits = {}
+        self.dot_map = bytearray()
+        defaults = dict(
+            frame=0,
+            level_start_frame=0,
+            fright_length=0,
+            fright_timer=0,
+            level=0,
+            score=0,
+            dots_eaten=0,
+            dots_left=0,
+            lives=0,
+            new_life_timer=0,
+            chase_timer=0,
+            scatter_timer=0,
+            scatter_count=0,
+            new_life_target=0,
+            ghosts_eaten=0,
+            level_cleared=False,
+            end_of_level_timer=0,
+            current_ghost_mode=0,
+            mode_timer=0,
+            fright_counter=0,
+            game_state=PAUSED,
+        )
+        for k, v in defaults.items():
+            setattr(self, k, v)
+
+        self.initialise_new_game()
+
+    def score_changed(self):
+        pass
+
+    def lives_changed(self):
+        pass
+
+    def level_started(self):
+        pass
+
+    def level_ended(self):
+        pass
+
+    def game_ended(self):
+        pass
+
+    def show_message(self, text, pos, color, size, time, center):
+        pass
+
+    def start(self, seed=None):
+        self.seed = random.randrange(1 << 32) if seed is None else seed
+        self.rng.seed(self.seed)
+        self.inputs = []
+        self.initialise_new_game()
+        self.game_state = IN_PLAY
+        self.record(telemetry.START)
+
+    def record(self, kind, value=0, where=None):
+        if self.telemetry is not None:
+            where = where or self.pacman
+            x = round((where.center_x - 20) / GRID_WIDTH)
+            y = round((self.world[1] - 40 - where.center_y) / GRID_WIDTH)
+            self.telemetry.emit(kind, self.frame, self.level, x, y, value)
+
+    def steer(self, direction):
+        if direction != self.pacman.next_direction:
+            self.inputs.append((self.frame, direction))
+        self.pacman.next_direction = direction
+
+    def set_for_level(self):
+        self.level_start_frame = self.frame
+        self.scatter_count = self.ghosts_eaten = self.dots_eaten = 0
+        self.level_cleared = False
+        self.create_maze()
+        self.pacman.next_direction = HOLD
+        self.current_ghost_mode = Ghost.CHASE
+        self.mode_timer = self.tuning["chase_timer"]
+        self.fright_counter = 0
+        ramp = max(0, 6 - self.level) * 5
+        self.pacman.set_speed_percent(max(0, self.tuning["pacman_speed"] - ramp))
+        for g in self.scene["Ghosts"]:
+            g.set_speed_percent(max(0, self.tuning["ghost_speed"] - ramp))
+        self.level_started()
+
+    def initialise_new_game(self):
+        self.frame = 0
+        self.ghost_scores = []
+        self.score = 0
+        self.level = 1
+        self.lives = START_LIVES
+        self.chase_timer = self.tuning["chase_timer"]
+        self.scatter_timer = self.tuning["scatter_timer"]
+        self.fright_length = self.tuning["fright_timer"]
+        self.new_life_target = NEW_LIFE_INTERVAL
+        self.set_for_level()
+        self.score_changed()
+        self.lives_changed()
+
+    def add_new_life(self):
+        if self.lives < 5:
+            self.lives += 1
+            self.show_message("Новая жизнь", (0, 15), RED, INST_FONT_SIZE, 100, True)
+            self.lives_changed()
+            audio.play("extra")
+
+    def detach_level_lists(self):
+        old = []
+        for name in LEVEL_LISTS:
+            old.append(self.scene[name])
+            self.scene.remove_sprite_list_by_name(name)
+        return old
+
+    def attach_level_lists(self, staged):
+        lists = dict(zip(LEVEL_LISTS, (staged.grid, staged.dots, staged.ghosts)))
+        for name in reversed(LEVEL_LISTS):
+            above = LAYERS[LAYERS.index(name) + 1]
+            self.scene.add_sprite_list_before(name, above, sprite_list=lists[name])
+
+    def create_maze(self):
+        staged = self.staged
+        self.staged = None
+        old = self.detach_level_lists()
+        if staged is None or staged.level != self.level:
+            if staged is not None:
+                lists = (staged.grid, staged.dots, staged.ghosts)
+                self.pool.release(staged.sprites, lists)
+            self.pool.release(self.level_sprites, old)
+            old = ()
+            staged = StagedLevel(
+                self.level, self.layouts, self.swarm_size, self.rng, self.pool
+            )
+        staged.finish()
+        self.attach_level_lists(staged)
+        self.generation += 1
+        self.scene["Bonus"].clear()
+        self.pool.release(self.level_sprites, old)
+        self.level_sprites = staged.sprites
+        self.dots_left = len(staged.dots)
+        self.pacman = staged.pacman
+        self.scene.add_sprite("Pacman", self.pacman)
+        self.world = staged.world
+        self.layers = staged.layers
+        self.dot_map = staged.dot_map
+        self.fruit_position = staged.fruit_position
+        self.exit_point = staged.exit_point
+        self.exits = staged.exits
+        self.swarm = staged.swarm
+
+    def update_score(self, points):
+        self.score += points
+        self.score_changed()
+        if self.score >= self.new_life_target:
+            self.new_life_target += NEW_LIFE_INTERVAL
+            self.add_new_life()
+
+    def snap_to_grid(self, pos, speed):
+        ip = round(pos)
+        base = (ip // 20) * 20
+        dist = pos - base
+        t = speed / 1.5
+        if dist >= 20 - t:
+            return ip + 20 - ip % 20
+        if dist <= t:
+            return ip - ip % 20
+        return pos
+
+    def try_to_move(self, direction, obj):
+        if direction != obj.current_direction:
+            obj.center_x = self.snap_to_grid(obj.center_x, obj.speed)
+            obj.center_y = self.snap_to_grid(obj.center_y, obj.speed)
+        vx = obj.speed if direction == RIGHT else -obj.speed if direction == LEFT else 0
+        vy = obj.speed if direction == UP else -obj.speed if direction == DOWN else 0
+        obj.center_x += vx
+        obj.center_y += vy
+        hits = arcade.check_for_collision_with_list(obj, self.scene["Grid"])
+        if hits:
+            b = hits[0]
+            if direction == LEFT:
+                obj.center_x = b.center_x + 20
+            elif direction == RIGHT:
+                obj.center_x = b.center_x - 20
+            elif direction == UP:
+                obj.center_y = b.center_y - 20
+            elif direction == DOWN:
+                obj.center_y = b.center_y + 20
+            return False
+        if obj.current_direction != direction:
+            obj.current_direction = direction
+            obj.change_direction = True
+        return True
+
+    def pre_turn(self, direction):
+        pacman = self.pacman
+        current = pacman.current_direction
+        if current in (HOLD, direction, opposite[direction]):
+            return
+        dx, dy = offsets[current]
+        pos = pacman.center_x if dx else pacman.center_y
+        ahead = (math.floor(pos / GRID_WIDTH) + ((dx or dy) > 0)) * GRID_WIDTH
+        behind = ahead - (dx or dy) * GRID_WIDTH
+        for centre in (ahead, behind):
+            if abs(centre - pos) > self.cornering:
+                continue
+            if dx:
+                tile = grid_tile(centre, pacman.center_y)
+            else:
+                tile = grid_tile(pacman.center_x, centre)
+            if direction in self.exits.get(tile, ()):
+                if dx:
+                    pacman.center_x = centre
+                else:
+                    pacman.center_y = centre
+                return
+
+    def move_pacman(self, nd):
+        if self.cornering and nd != self.pacman.current_direction:
+            self.pre_turn(nd)
+        if not self.try_to_move(nd, self.pacman):
+            self.try_to_move(self.pacman.current_direction, self.pacman)
+        if self.pacman.center_x < 2:
+            self.pacman.center_x = self.world[0] - 22
+        elif self.pacman.center_x > self.world[0] - 22:
+            self.pacman.center_x = 2
+
+    def move_ghost(self, ghost, direction):
+        if not self.try_to_move(direction, ghost):
+            return False
+        ghost.set_direction_image(direction)
+        if ghost.center_x < 2:
+            ghost.center_x = self.world[0] - 22
+        elif ghost.center_x > self.world[0] - 22:
+            ghost.center_x = 2
+        return True
+
+    def ghost_fright_over(self):
+        self.ghosts_eaten = 0
+        for g in self.scene["Ghosts"]:
+            g.set_default_mode(False)
+        self.mode_timer = self.chase_timer
+
+    def change_ghost_mode(self):
+        if self.scatter_count < 3 and self.current_ghost_mode == Ghost.CHASE:
+            self.scatter_count += 1
+            self.current_ghost_mode = Ghost.SCATTER
+            self.mode_timer = self.scatter_timer
+            for g in self.scene["Ghosts"]:
+                g.set_scatter_mode()
+        else:
+            self.current_ghost_mode = Ghost.CHASE
+            self.mode_timer = self.chase_timer
+            for g in self.scene["Ghosts"]:
+                g.set_default_mode(False)
+        self.record(telemetry.MODE, self.current_ghost_mode)
+
+    def check_if_eaten_dot(self):
+        hits = arcade.check_for_collision_with_list(self.pacman, self.scene["Bonus"])
+        if not hits:
+            hits = self.dots_touched()
+        if not hits:
+            return
+        dot = hits[0]
+        self.update_score(dot.score)
+        if dot.index >= 0:
+            dot.visible = False
+            self.dot_map[dot.index] = 0
+            self.dots_left -= 1
+        else:
+            dot.done = True
+        self.record(event_for_dot[dot.dtype], dot.score, dot)
+        self.dots_eaten += 1
+        for g in self.scene["Ghosts"]:
+            g.reduce_delay()
+        if dot.dtype == Dot.ENERGISER:
+            audio.play("energiser")
+            for g in self.scene["Ghosts"]:
+                g.set_frightened_mode()
+            Ghost.fright_timer = self.fright_length
+        elif dot.dtype == Dot.FRUIT:
+            audio.play("fruit")
+            self.show_message(
+                f"{dot.score}",
+                (dot.center_x - 10, dot.center_y - 5),
+                WHITE,
+                SCORE_FONT_SIZE,
+                100,
+                False,
+            )
+        if self.dots_eaten in (70, 170):
+            fruit = self.pool.take(
+                Dot,
+                Dot.FRUIT,
+                self.fruit_position[0],
+                self.fruit_position[1],
+                self.level,
+                self.world[1],
+            )
+            self.level_sprites.append(fruit)
+            self.scene.add_sprite("Bonus", fruit)
+
+    def dots_touched(self):
+        if self.layers is None:
+            chunks = (self.scene["Dots"],)
+        else:
+            chunks = self.layers["Dots"].around(*self.pacman.position)
+        for chunk in chunks:
+            hits = arcade.check_for_collision_with_list(self.pacman, chunk)
+            hits = [dot for dot in hits if dot.visible]
+            if hits:
+                return hits
+        return []
+
+    def check_if_ghost_collide(self):
+        hits = arcade.check_for_collision_with_list(self.pacman, self.scene["Ghosts"])
+        for ghost in hits:
+            if ghost.mode == Ghost.FRIGHTENED:
+                if self.ghosts_eaten < 4:
+                    self.ghosts_eaten += 1
+                pts = ghost_score[self.ghosts_eaten - 1]
+                self.ghost_scores.append(pts)
+                self.update_score(pts)
+                self.show_message(
+                    f"{pts}",
+                    (ghost.center_x - 10, ghost.center_y - 5),
+                    WHITE,
+                    SCORE_FONT_SIZE,
+                    100,
+                    False,
+                )
+                ghost.return_to_pen()
+                self.record(telemetry.GHOST_EATEN, pts, ghost)
+            elif ghost.mode != Ghost.CAUGHT:
+                self.record(telemetry.CAUGHT, ghost.gtype)
+                self.pacman.set_caught()
+                self.lives -= 1
+                self.lives_changed()
+                return
+
+    def step(self, delta_time=1 / FRAME_REFRESH):
+        if self.game_state != IN_PLAY:
+            return
+        self.frame += 1
+        Ghost.fright_timer = self.fright_timer
+        Ghost.ghost_exit_point = self.exit_point
+        Ghost.rng = self.rng
+        self.advance(delta_time)
+        self.fright_timer = Ghost.fright_timer
+        if self.live_state is not None:
+            self.live_state.publish(self)
+
+    def advance(self, delta_time):
+        if self.pacman.done:
+            if self.lives < 1:
+                self.game_state = GAME_OVER
+                self.record(telemetry.GAME_OVER, self.score)
+                self.game_ended()
+            else:
+                self.pacman.return_to_start()
+                self.pacman.next_direction = HOLD
+                for g in self.scene["Ghosts"]:
+                    g.jump_to_start()
+                self.ghost_fright_over()
+            return
+
+        if (
+            not self.level_cleared
+            and self.pacman.next_direction != HOLD
+            and not self.pacman.caught()
+        ):
+            self.move_pacman(self.pacman.next_direction)
+
+        self.check_if_eaten_dot()
+
+        if not self.pacman.caught():
+            if self.dots_left == 0 and len(self.scene["Bonus"]) == 0:
+                if not self.level_cleared:
+                    self.level_cleared = True
+                    self.record(
+                        telemetry.LEVEL_CLEARED, self.frame - self.level_start_frame
+                    )
+                    self.end_of_level_timer = END_OF_LEVEL_DELAY
+                    self.level_ended()
+                    self.staged = StagedLevel(
+                        self.level + 1,
+                        self.layouts,
+                        self.swarm_size,
+                        self.rng,
+                        self.pool,
+                    )
+                    audio.play("level")
+                self.end_of_level_timer -= 1
+                self.staged.advance()
+                if self.end_of_level_timer <= 0:
+                    self.level += 1
+                    self.set_for_level()
+                    self.chase_timer += FRAME_REFRESH * 2
+                    if self.scatter_timer > FRIGHT_TIMER * 5:
+                        self.scatter_timer -= FRAME_REFRESH // 2
+                    if self.fright_length > FRAME_REFRESH * 5:
+                        self.fright_length -= FRAME_REFRESH // 2
+                else:
+                    return
+
+            self.check_if_ghost_collide()
+
+            if Ghost.fright_timer > 0:
+                Ghost.fright_timer -= 1
+                if Ghost.fright_timer <= 0:
+                    self.ghost_fright_over()
+            else:
+                self.mode_timer -= 1
+                if self.mode_timer <= 0:
+                    self.change_ghost_mode()
+
+            if self.swarm is not None:
+                self.swarm.step(self.scene["Ghosts"], self.pacman)
+            else:
+                self.move_ghosts()
+
+        self.scene.update(delta_time, MOVING)
+
+    def move_ghosts(self):
+        for ghost in self.scene["Ghosts"]:
+            d = ghost.set_direction(self.pacman)
+            if not self.move_ghost(ghost, d):
+                if not self.move_ghost(ghost, ghost.current_direction):
+                    order = ghost.get_order()
+                    moved = False
+                    back = opposite[ghost.current_direction]
+                    for o in order:
+                        if o == back:
+                            continue
+                        if self.move_ghost(ghost, o):
+                            moved = True
+                            break
+                    if not moved:
+                        self.move_ghost(ghost, back if back != HOLD else LEFT)
+
+    def snapshot(self):
+        p = self.pacman
+        return State(
+            self.frame,
+            self.game_state,
+            self.score,
+            self.lives,
+            self.level,
+            (p.center_x, p.center_y, p.current_direction, p.caught()),
+            tuple(
+                (g.center_x, g.center_y, g.current_direction, g.mode)
+                for g in self.scene["Ghosts"]
+            ),
+            bytes(self.dot_map),
+        )
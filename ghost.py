@@ -1,9 +1,22 @@
 import random
+from functools import lru_cache
 
 import arcade
 
+import audio
 import constants
-from constants import RIGHT, LEFT, UP, DOWN, HOLD, WINDOW_HEIGHT, WINDOW_WIDTH
+from animation import schedule
+from constants import (
+    RIGHT,
+    LEFT,
+    UP,
+    DOWN,
+    HOLD,
+    WINDOW_HEIGHT,
+    WINDOW_WIDTH,
+    GRID_WIDTH,
+)
+from grid import tile_position
 
 ghost_mex_speed = 3.33
 random_interval = 250
@@ -43,7 +56,8 @@ frightened = arcade.load_texture("images/frightened.png")
 frightenedW = arcade.load_texture("images/frightened2.png")
 caught = arcade.load_texture("images/caught.png")
 
-caught_sound = arcade.load_sound("sounds/eatghost.wav")
+flash = schedule((frightened, 1), *((frightenedW, 15), (frightened, 15)) * 4)
+
 ghost_score = [200, 400, 800, 1600]
 delay_to_release = [1, 10, 30, 90]
 delay_to_release_after_caught = [1, 5, 15, 25]
@@ -60,9 +74,41 @@ cycle_order = [
 ]
 
 
+def grid_tile(x, y):
+    return round(x / GRID_WIDTH), round(y / GRID_WIDTH)
+
+
+@lru_cache(maxsize=64)
+def choose_exit(direction, east, north, across):
+    if across:
+        if east > 0:
+            if direction != LEFT:
+                return RIGHT
+            elif north > 0:
+                return UP
+            return DOWN
+        elif direction != RIGHT:
+            return LEFT
+        elif north < 0:
+            return DOWN
+        return UP
+    if north < 0:
+        if direction != UP:
+            return DOWN
+        elif east > 0:
+            return RIGHT
+        return LEFT
+    elif direction != DOWN:
+        return UP
+    elif east > 0:
+        return RIGHT
+    return LEFT
+
+
 class Ghost(arcade.Sprite):
     fright_timer = 0
     ghost_exit_point = ()
+    rng = random.Random()
 
     BLINKY = 0
     PINKY = 1
@@ -75,14 +121,18 @@ class Ghost(arcade.Sprite):
     RANDOM = 3
     CAUGHT = 4
 
-    def __init__(self, gtype, x, y):
+    def __init__(self, gtype, x, y, width=WINDOW_WIDTH, height=WINDOW_HEIGHT):
+        super().__init__(frightened, 18 / 20)
+        self.reset(gtype, x, y, width, height)
+
+    def reset(self, gtype, x, y, width=WINDOW_WIDTH, height=WINDOW_HEIGHT):
         self.gtype = gtype
-        x = x * 20 + 20
-        y = WINDOW_HEIGHT - (y * 20 + 40)
+        self.world = (width, height)
+        x, y = tile_position(x, y, height)
         if gtype == Ghost.BLINKY:
             x -= 10
             Ghost.ghost_exit_point = (x, y)
-        super().__init__(frightened, 18 / 20, x, y)
+        self.position = (x, y)
         self.start_position = (x, y)
         self.speed = ghost_mex_speed
         self.speed_for_level = ghost_mex_speed
@@ -136,7 +186,7 @@ class Ghost(arcade.Sprite):
             self.reverse_direction()
 
     def return_to_pen(self):
-        caught_sound.play(volume=0.15)
+        audio.play("ghost")
         self.texture = caught
         self.mode = Ghost.CAUGHT
         self.speed = ghost_mex_speed * 2
@@ -157,138 +207,126 @@ class Ghost(arcade.Sprite):
         self.speed = self.speed_for_level
         self.current_direction = HOLD
 
+    def at_tile_centre(self):
+        t = self.speed / 1.5
+        return (
+            abs(self.center_x - round(self.center_x / GRID_WIDTH) * GRID_WIDTH) <= t
+            and abs(self.center_y - round(self.center_y / GRID_WIDTH) * GRID_WIDTH)
+            <= t
+        )
+
     def set_direction_image(self, direction):
         if self.mode != Ghost.FRIGHTENED and self.mode != Ghost.CAUGHT:
             self.texture = ghost_image[self.gtype][direction]
 
-    def set_direction(self, pacman):
-        if self.delay <= 0:
-            if self.current_direction == HOLD:
-                self.center_x = Ghost.ghost_exit_point[0]
-                self.center_y = Ghost.ghost_exit_point[1]
-            match self.mode:
-                case Ghost.CHASE:
-                    match self.gtype:
-                        case Ghost.BLINKY | Ghost.CLYDE:
-                            self.target = (pacman.center_x, pacman.center_y)
-                        case Ghost.PINKY:
-                            match pacman.current_direction:
-                                case constants.LEFT | constants.HOLD:
-                                    self.target = (
-                                        pacman.center_x - 80,
-                                        pacman.center_y,
-                                    )
-                                case constants.RIGHT:
-                                    self.target = (
-                                        pacman.center_x + 80,
-                                        pacman.center_y,
-                                    )
-                                case constants.UP:
-                                    self.target = (
-                                        pacman.center_x,
-                                        pacman.center_y - 80,
-                                    )
-                                case constants.DOWN:
-                                    self.target = (
-                                        pacman.center_x,
-                                        pacman.center_y + 80,
-                                    )
-                        case Ghost.INKY:
-                            match pacman.current_direction:
-                                case constants.LEFT | constants.HOLD:
-                                    self.target = (
-                                        pacman.center_x + 80,
-                                        pacman.center_y,
-                                    )
-                                case constants.RIGHT:
-                                    self.target = (
-                                        pacman.center_x - 80,
-                                        pacman.center_y,
-                                    )
-                                case constants.UP:
-                                    self.target = (
-                                        pacman.center_x,
-                                        pacman.center_y + 80,
-                                    )
-                                case constants.DOWN:
-                                    self.target = (
-                                        pacman.center_x,
-                                        pacman.center_y - 80,
-                                    )
-                case Ghost.SCATTER:
-                    match self.gtype:
-                        case Ghost.BLINKY:
-                            self.target = (-200, -100)
-                        case Ghost.PINKY:
-                            self.target = (WINDOW_WIDTH + 200, -100)
-                        case Ghost.INKY:
-                            self.target = (-200, WINDOW_HEIGHT + 250)
-                        case Ghost.CLYDE:
-                            self.target = (WINDOW_WIDTH + 200, WINDOW_HEIGHT + 250)
-                case Ghost.RANDOM | Ghost.FRIGHTENED:
-                    self.random_timer += 1
-                    if self.random_timer >= random_interval - 1:
-                        self.last_target = (
-                            random.randint(0, WINDOW_WIDTH - 1),
-                            random.randint(0, WINDOW_HEIGHT - 1),
+    def update_target(self, pacman):
+        if self.current_direction == HOLD:
+            self.center_x = Ghost.ghost_exit_point[0]
+            self.center_y = Ghost.ghost_exit_point[1]
+        match self.mode:
+            case Ghost.CHASE:
+                match self.gtype:
+                    case Ghost.BLINKY | Ghost.CLYDE:
+                        self.target = (pacman.center_x, pacman.center_y)
+                    case Ghost.PINKY:
+                        match pacman.current_direction:
+                            case constants.LEFT | constants.HOLD:
+                                self.target = (
+                                    pacman.center_x - 80,
+                                    pacman.center_y,
+                                )
+                            case constants.RIGHT:
+                                self.target = (
+                                    pacman.center_x + 80,
+                                    pacman.center_y,
+                                )
+                            case constants.UP:
+                                self.target = (
+                                    pacman.center_x,
+                                    pacman.center_y - 80,
+                                )
+                            case constants.DOWN:
+                                self.target = (
+                                    pacman.center_x,
+                                    pacman.center_y + 80,
+                                )
+                    case Ghost.INKY:
+                        match pacman.current_direction:
+                            case constants.LEFT | constants.HOLD:
+                                self.target = (
+                                    pacman.center_x + 80,
+                                    pacman.center_y,
+                                )
+                            case constants.RIGHT:
+                                self.target = (
+                                    pacman.center_x - 80,
+                                    pacman.center_y,
+                                )
+                            case constants.UP:
+                                self.target = (
+                                    pacman.center_x,
+                                    pacman.center_y + 80,
+                                )
+                            case constants.DOWN:
+                                self.target = (
+                                    pacman.center_x,
+                                    pacman.center_y - 80,
+                                )
+            case Ghost.SCATTER:
+                match self.gtype:
+                    case Ghost.BLINKY:
+                        self.target = (-200, -100)
+                    case Ghost.PINKY:
+                        self.target = (self.world[0] + 200, -100)
+                    case Ghost.INKY:
+                        self.target = (-200, self.world[1] + 250)
+                    case Ghost.CLYDE:
+                        self.target = (
+                            self.world[0] + 200,
+                            self.world[1] + 250,
                         )
-                        self.random_timer = 0
-                        self.target = self.last_target
-                    if self.mode == Ghost.FRIGHTENED and Ghost.fright_timer < 120:
-                        if Ghost.fright_timer % 15 == 0:
-                            if self.texture == frightened:
-                                self.texture = frightenedW
-                            else:
-                                self.texture = frightened
-                case Ghost.CAUGHT:
-                    if (
-                        abs(Ghost.ghost_exit_point[0] - self.center_x) < 20
-                        and abs(Ghost.ghost_exit_point[1] - self.center_y) < 20
-                    ):
-                        self.center_x = self.start_position[0]
-                        self.center_y = self.start_position[1]
-                        self.mode = Ghost.CHASE
-                        self.set_default_mode(False)
-                        self.current_direction = HOLD
-                        self.delay = delay_to_release_after_caught[self.gtype]
-                    self.target = Ghost.ghost_exit_point
+            case Ghost.RANDOM | Ghost.FRIGHTENED:
+                self.random_timer += 1
+                if self.random_timer >= random_interval - 1:
+                    self.last_target = (
+                        Ghost.rng.randint(0, self.world[0] - 1),
+                        Ghost.rng.randint(0, self.world[1] - 1),
+                    )
+                    self.random_timer = 0
+                    self.target = self.last_target
+                if self.mode == Ghost.FRIGHTENED:
+                    self.texture = flash[min(Ghost.fright_timer, len(flash) - 1)]
+            case Ghost.CAUGHT:
+                if (
+                    abs(Ghost.ghost_exit_point[0] - self.center_x) < 20
+                    and abs(Ghost.ghost_exit_point[1] - self.center_y) < 20
+                ):
+                    self.center_x = self.start_position[0]
+                    self.center_y = self.start_position[1]
+                    self.mode = Ghost.CHASE
+                    self.set_default_mode(False)
+                    self.current_direction = HOLD
+                    self.delay = delay_to_release_after_caught[self.gtype]
+                self.target = Ghost.ghost_exit_point
 
-            tx = self.target[0] - self.center_x
-            ty = self.target[1] - self.center_y
+    def set_direction(self, pacman):
+        if self.delay <= 0:
+            self.update_target(pacman)
             if self.current_direction == HOLD:
-                if tx > 0:
+                if self.target[0] > self.center_x:
                     self.current_direction = RIGHT
                 else:
                     self.current_direction = LEFT
-            if abs(tx) > abs(ty):
-                if self.target[0] > self.center_x:
-                    if self.current_direction != LEFT:
-                        go_to = RIGHT
-                    elif self.target[1] > self.center_y:
-                        go_to = UP
-                    else:
-                        go_to = DOWN
-                elif self.current_direction != RIGHT:
-                    go_to = LEFT
-                elif self.target[1] < self.center_y:
-                    go_to = DOWN
-                else:
-                    go_to = UP
-            else:
-                if self.target[1] < self.center_y:
-                    if self.current_direction != UP:
-                        go_to = DOWN
-                    elif self.target[0] > self.center_x:
-                        go_to = RIGHT
-                    else:
-                        go_to = LEFT
-                elif self.current_direction != DOWN:
-                    go_to = UP
-                elif self.target[0] > self.center_x:
-                    go_to = RIGHT
-                else:
-                    go_to = LEFT
-            return go_to
+            elif not self.at_tile_centre():
+                return self.current_direction
+            tx = self.target[0] - self.center_x
+            ty = self.target[1] - self.center_y
+            return choose_exit(
+                self.current_direction,
+                (tx > 0) - (tx < 0),
+                (ty > 0) - (ty < 0),
+                abs(tx) > abs(ty),
+            )
         else:
             return HOLD
 
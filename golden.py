@@ -0,0 +1,292 @@
+import argparse
+import os
+import random
+import struct
+import sys
+import zlib
+from array import array
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
+
+import audio
+import telemetry
+from bot import Model
+from constants import IN_PLAY, HOLD, LEFT, RIGHT, UP, DOWN
+from game import Game
+from ghost import Ghost, grid_tile
+from maze_grids import maze_layouts
+
+MAGIC = b"GOLD"
+VERSION = 1
+header = struct.Struct("<4sHHII")
+FRAMES = 1800
+SEED = 2024
+RUNS = 3
+CAMPAIGNS = 3
+CAMPAIGN_FRAMES = 6000
+FIELDS = ("counters", "timers", "pacman", "ghosts", "bonus", "dots")
+
+
+def counters(game):
+    return struct.pack(
+        "<8i",
+        game.frame,
+        game.game_state,
+        game.score,
+        game.lives,
+        game.level,
+        game.dots_eaten,
+        game.ghosts_eaten,
+        game.current_ghost_mode,
+    )
+
+
+def timers(game):
+    return struct.pack(
+        "<6i",
+        game.fright_timer,
+        game.mode_timer,
+        game.scatter_count,
+        game.end_of_level_timer,
+        game.new_life_target,
+        game.level_cleared,
+    )
+
+
+def pacman(game):
+    p = game.pacman
+    return struct.pack(
+        "<ddBB?",
+        p.center_x,
+        p.center_y,
+        p.current_direction,
+        p.next_direction,
+        p.caught(),
+    )
+
+
+def ghosts(game):
+    return b"".join(
+        struct.pack(
+            "<ddBBddi",
+            g.center_x,
+            g.center_y,
+            g.current_direction,
+            g.mode,
+            g.target[0],
+            g.target[1],
+            g.delay,
+        )
+        for g in game.scene["Ghosts"]
+    )
+
+
+def bonus(game):
+    return b"".join(
+        struct.pack("<ddi", b.center_x, b.center_y, b.timer)
+        for b in game.scene["Bonus"]
+    )
+
+
+def dots(game):
+    return bytes(game.dot_map)
+
+
+encoders = (counters, timers, pacman, ghosts, bonus, dots)
+
+coverage_events = {
+    "levels cleared": telemetry.LEVEL_CLEARED,
+    "energisers": telemetry.ENERGISER,
+    "ghosts eaten": telemetry.GHOST_EATEN,
+    "fruit": telemetry.FRUIT,
+    "deaths": telemetry.CAUGHT,
+    "game overs": telemetry.GAME_OVER,
+}
+
+
+class Coverage(Counter):
+    def emit(self, kind, frame, level, x, y, value=0):
+        self[kind] += 1
+
+    def summary(self):
+        return ", ".join(
+            f"{name} {self[kind]}" for name, kind in coverage_events.items()
+        )
+
+
+def record_frame(game, hashes, trace):
+    for i, encode in enumerate(encoders):
+        hashes[i] = zlib.crc32(encode(game), hashes[i])
+    trace.extend(hashes)
+
+
+def session(key, frames=FRAMES, seed=SEED):
+    maze, run = key
+    game = Game()
+    game.start(seed + maze * RUNS + run)
+    if maze:
+        game.level = maze + 1
+        game.set_for_level()
+    script = random.Random(seed - maze * RUNS - run)
+    hashes = [0] * len(encoders)
+    trace = array("I")
+    while game.game_state == IN_PLAY and game.frame < frames:
+        if game.frame % 8 == 0:
+            game.steer(script.choice((LEFT, RIGHT, UP, DOWN)))
+        game.step()
+        record_frame(game, hashes, trace)
+    return trace, None
+
+
+def greedy(game, model, wary=True):
+    start = grid_tile(game.pacman.center_x, game.pacman.center_y)
+    danger = set()
+    targets = set()
+    for g in game.scene["Ghosts"]:
+        tile = grid_tile(g.center_x, g.center_y)
+        if g.mode == Ghost.FRIGHTENED:
+            targets.add(tile)
+        elif wary and g.mode != Ghost.CAUGHT and g.delay <= 0:
+            danger.add(tile)
+            danger.update(model.move(tile, d) for d in model.exits.get(tile, ()))
+    for name in ("Dots", "Bonus"):
+        for dot in game.scene[name]:
+            if dot.visible:
+                targets.add(grid_tile(dot.center_x, dot.center_y))
+    seen = {start}
+    queue = deque([(start, HOLD)])
+    while queue:
+        tile, first = queue.popleft()
+        if tile in targets and first != HOLD:
+            return first
+        for d in model.exits.get(tile, ()):
+            step = model.move(tile, d)
+            if step not in seen and step not in danger:
+                seen.add(step)
+                queue.append((step, d if first == HOLD else first))
+    return game.pacman.current_direction
+
+
+def campaign(run, frames=CAMPAIGN_FRAMES, seed=SEED):
+    game = Game()
+    game.telemetry = coverage = Coverage()
+    wary = run > 0
+    games = 0
+    generation = None
+    model = None
+    last = None
+    hashes = [0] * len(encoders)
+    trace = array("I")
+    for _ in range(frames):
+        if game.game_state != IN_PLAY:
+            game.start(seed + run * 100 + games)
+            games += 1
+        if game.generation != generation:
+            generation = game.generation
+            model = Model(game.exits)
+            last = None
+        tile = grid_tile(game.pacman.center_x, game.pacman.center_y)
+        if tile != last:
+            last = tile
+            game.steer(greedy(game, model, wary))
+        game.step()
+        record_frame(game, hashes, trace)
+    return trace, coverage
+
+
+def play(key):
+    if key[0] == "campaign":
+        return campaign(key[1])
+    return session(key)
+
+
+def trace_path(directory, key):
+    if key[0] == "campaign":
+        return os.path.join(directory, f"campaign-{key[1]}.trace")
+    return os.path.join(directory, "maze{}-{}.trace".format(*key))
+
+
+def session_name(key):
+    if key[0] == "campaign":
+        return f"campaign {key[1]}"
+    return "maze {} run {}".format(*key)
+
+
+def write_trace(path, trace):
+    if sys.byteorder == "big":
+        trace.byteswap()
+    with open(path, "wb") as f:
+        f.write(header.pack(MAGIC, VERSION, len(FIELDS), len(trace) // len(FIELDS), 0))
+        trace.tofile(f)
+
+
+def read_trace(path):
+    with open(path, "rb") as f:
+        magic, version, fields, frames, _ = header.unpack(f.read(header.size))
+        if magic != MAGIC or version != VERSION or fields != len(FIELDS):
+            raise ValueError(f"{path} is not a golden trace")
+        trace = array("I")
+        trace.fromfile(f, frames * fields)
+    if sys.byteorder == "big":
+        trace.byteswap()
+    return trace
+
+
+def divergence(golden, trace):
+    width = len(FIELDS)
+    for frame in range(min(len(golden), len(trace)) // width):
+        row = slice(frame * width, (frame + 1) * width)
+        if golden[row] != trace[row]:
+            changed = [f for f, a, b in zip(FIELDS, golden[row], trace[row]) if a != b]
+            return frame + 1, changed
+    if len(golden) != len(trace):
+        return min(len(golden), len(trace)) // width + 1, ["length"]
+    return None
+
+
+def init_worker():
+    audio.enabled = False
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "command", choices=("check", "record"), nargs="?", default="check"
+    )
+    parser.add_argument("--dir", default="golden")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    args = parser.parse_args()
+    audio.enabled = False
+    keys = [(maze, run) for maze in range(len(maze_layouts)) for run in range(RUNS)]
+    keys += [("campaign", run) for run in range(CAMPAIGNS)]
+    with ProcessPoolExecutor(args.workers, initializer=init_worker) as pool:
+        results = list(pool.map(play, keys))
+    failed = 0
+    covered = Coverage()
+    for key, (trace, coverage) in zip(keys, results):
+        name = session_name(key)
+        path = trace_path(args.dir, key)
+        frames = len(trace) // len(FIELDS)
+        if coverage is not None:
+            covered.update(coverage)
+            print(f"{name}: {coverage.summary()}")
+        if args.command == "record":
+            os.makedirs(args.dir, exist_ok=True)
+            write_trace(path, trace)
+            print(f"{name}: recorded {frames} frames")
+            continue
+        found = divergence(read_trace(path), trace)
+        if found is None:
+            print(f"{name}: ok, {frames} frames")
+        else:
+            failed += 1
+            print(f"{name}: diverged at frame {found[0]} in {', '.join(found[1])}")
+    missing = [name for name, kind in coverage_events.items() if not covered[kind]]
+    if missing:
+        failed += 1
+        print(f"campaigns no longer reach: {', '.join(missing)}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,31 @@
+from constants import GRID_WIDTH, WINDOW_HEIGHT, HOLD, LEFT, RIGHT, UP, DOWN
+
+opposite = {LEFT: RIGHT, RIGHT: LEFT, UP: DOWN, DOWN: UP, HOLD: HOLD}
+offsets = {LEFT: (-1, 0), RIGHT: (1, 0), UP: (0, 1), DOWN: (0, -1)}
+
+
+def tile_position(x, y, height=WINDOW_HEIGHT):
+    return x * GRID_WIDTH + 20, height - (y * GRID_WIDTH + 40)
+
+
+def world_size(layout):
+    return len(layout[0]) * GRID_WIDTH + 20, len(layout) * GRID_WIDTH + 80
+
+
+def tile_exits(layout, height=WINDOW_HEIGHT):
+    top = (height - 40) // GRID_WIDTH
+    width = len(layout[0])
+    exits = {}
+    for row, line in enumerate(layout):
+        for col, c in enumerate(line):
+            if c in "XO":
+                continue
+            legal = []
+            for d, (dx, dy) in offsets.items():
+                r, cl = row - dy, col + dx
+                if 0 <= r < len(layout) and (cl < 0 or cl >= width):
+                    legal.append(d)
+                elif 0 <= r < len(layout) and layout[r][cl] not in "XO":
+                    legal.append(d)
+            exits[(col + 1, top - row)] = tuple(legal)
+    return exits
@@ -0,0 +1,52 @@
+import time
+from collections import Counter, deque
+
+
+class LatencyMeter:
+    def __init__(self, size=4096):
+        self.samples = deque(maxlen=size)
+        self.frames = Counter()
+        self.pending = None
+        self.applied = None
+        self.dropped = 0
+
+    def pressed(self, direction, frame):
+        if self.pending is not None:
+            if self.pending[0] == direction:
+                return
+            self.dropped += 1
+        self.pending = (direction, frame, time.perf_counter())
+
+    def updated(self, direction, frame):
+        if self.pending is not None and self.pending[0] == direction:
+            self.frames[frame - self.pending[1]] += 1
+            self.applied = self.pending
+            self.pending = None
+
+    def cancel(self):
+        self.pending = None
+
+    def drawn(self):
+        if self.applied is not None:
+            self.samples.append(time.perf_counter() - self.applied[2])
+            self.applied = None
+
+    def percentile(self, q):
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    def report(self):
+        lines = [f"inputs: {len(self.samples)}  dropped: {self.dropped}"]
+        if self.samples:
+            lines.append(
+                "latency ms: "
+                + "  ".join(
+                    f"p{int(q * 100)} {self.percentile(q) * 1000:.1f}"
+                    for q in (0.5, 0.9, 0.99)
+                )
+                + f"  max {max(self.samples) * 1000:.1f}"
+            )
+        total = sum(self.frames.values())
+        for frames, count in sorted(self.frames.items()):
+            lines.append(f"{frames:3d} frames {count:6d} {count / total:6.1%}")
+        return lines
@@ -0,0 +1,148 @@
+import argparse
+import struct
+import time
+from multiprocessing import resource_tracker, shared_memory
+
+from state import State
+
+MAGIC = b"PACS"
+VERSION = 1
+header = struct.Struct("<4sHHIQ")
+counters = struct.Struct("<IiHBBHxxI")
+actor = struct.Struct("<ffBBxx")
+SEQUENCE = 12
+
+
+def dot_capacity(layouts):
+    return max(sum(row.count(".") + row.count("E") for row in m) for m in layouts)
+
+
+class LiveState:
+    def __init__(self, game, name="pacman-live"):
+        self.ghosts = 4 + game.swarm_size
+        self.dots = dot_capacity(game.layouts)
+        self.pacman_at = header.size + counters.size
+        self.ghosts_at = self.pacman_at + actor.size
+        self.dots_at = self.ghosts_at + actor.size * self.ghosts
+        size = self.dots_at + self.dots
+        self.memory = shared_memory.SharedMemory(name, create=True, size=size)
+        self.buf = self.memory.buf
+        header.pack_into(self.buf, 0, MAGIC, VERSION, self.ghosts, self.dots, 0)
+        self.sequence = 0
+        self.publish(game)
+
+    def publish(self, game):
+        buf = self.buf
+        self.sequence += 1
+        struct.pack_into("<Q", buf, SEQUENCE, self.sequence)
+        ghosts = game.scene["Ghosts"]
+        count = min(len(ghosts), self.ghosts)
+        dots = len(game.dot_map)
+        counters.pack_into(
+            buf,
+            header.size,
+            game.frame,
+            game.score,
+            game.level,
+            game.game_state,
+            game.lives,
+            count,
+            dots,
+        )
+        p = game.pacman
+        actor.pack_into(
+            buf, self.pacman_at, p.center_x, p.center_y, p.current_direction, p.caught()
+        )
+        offset = self.ghosts_at
+        for i in range(count):
+            g = ghosts[i]
+            actor.pack_into(
+                buf, offset, g.center_x, g.center_y, g.current_direction, g.mode
+            )
+            offset += actor.size
+        buf[self.dots_at : self.dots_at + dots] = game.dot_map
+        self.sequence += 1
+        struct.pack_into("<Q", buf, SEQUENCE, self.sequence)
+
+    def close(self):
+        self.buf = None
+        self.memory.close()
+        self.memory.unlink()
+
+
+class LiveStateReader:
+    def __init__(self, name="pacman-live"):
+        try:
+            self.memory = shared_memory.SharedMemory(name, track=False)
+        except TypeError:
+            self.memory = shared_memory.SharedMemory(name)
+            resource_tracker.unregister(self.memory._name, "shared_memory")
+        self.buf = self.memory.buf
+        magic, version, self.ghosts, self.dots, _ = header.unpack_from(self.buf)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{name} is not a live state block")
+        self.pacman_at = header.size + counters.size
+        self.ghosts_at = self.pacman_at + actor.size
+        self.dots_at = self.ghosts_at + actor.size * self.ghosts
+        self.retries = 0
+
+    def sequence(self):
+        return struct.unpack_from("<Q", self.buf, SEQUENCE)[0]
+
+    def read(self):
+        buf = self.buf
+        while True:
+            before = self.sequence()
+            if before & 1:
+                self.retries += 1
+                continue
+            frame, score, level, game_state, lives, count, dots = counters.unpack_from(
+                buf, header.size
+            )
+            x, y, direction, caught = actor.unpack_from(buf, self.pacman_at)
+            ghosts = tuple(
+                actor.unpack_from(buf, self.ghosts_at + i * actor.size)
+                for i in range(count)
+            )
+            dot_map = bytes(buf[self.dots_at : self.dots_at + dots])
+            if self.sequence() == before:
+                return State(
+                    frame,
+                    game_state,
+                    score,
+                    lives,
+                    level,
+                    (x, y, direction, bool(caught)),
+                    ghosts,
+                    dot_map,
+                )
+            self.retries += 1
+
+    def close(self):
+        self.buf = None
+        self.memory.close()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("name", nargs="?", default="pacman-live")
+    parser.add_argument("--interval", type=float, default=0.1)
+    args = parser.parse_args()
+    reader = LiveStateReader(args.name)
+    try:
+        while True:
+            s = reader.read()
+            print(
+                f"frame {s.frame} score {s.score} lives {s.lives} level {s.level}"
+                f" pacman {s.pacman[0]:.0f},{s.pacman[1]:.0f}"
+                f" dots {sum(s.dots)} retries {reader.retries}"
+            )
+            time.sleep(args.interval)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        reader.close()
+
+
+if __name__ == "__main__":
+    main()
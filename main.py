@@ -1,63 +1,67 @@
+import argparse
+
 import arcade
 import pyglet
+from arcade.clock import GLOBAL_FIXED_CLOCK
 from pyglet.graphics import Batch
 
-from brick import Brick
+import audio
 from dot import Dot
-from ghost import Ghost, ghost_score
-from maze_grids import maze_layouts
+from bot import Autopilot
+from collector import POLICIES, Collector
+from constants import (
+    WINDOW_WIDTH,
+    WINDOW_HEIGHT,
+    PAUSED,
+    IN_PLAY,
+    GAME_OVER,
+    GRID_WIDTH,
+    FRAME_REFRESH,
+    HOLD,
+    LEFT,
+    RIGHT,
+    UP,
+    DOWN,
+    WHITE,
+    GREEN,
+    AQUA,
+    YELLOW,
+    SCORE_FONT_SIZE,
+    INST_FONT_SIZE,
+    HEADING_FONT_SIZE,
+)
+from game import MOVING, Game, StagedLevel
+from latency import LatencyMeter
+from livestate import LiveState
 from messages import Message
-from pac_man import PacMan
+from pacing import MODES, Pacer
+from replay import save
+from scores import ScoreBoard
+from simulation import SimulatedGame, Simulation
+from telemetry import Telemetry
 
 WINDOW_TITLE = "Pacman"
-WINDOW_WIDTH = 580
-WINDOW_HEIGHT = 700
-WINDOW_CENTER = WINDOW_WIDTH / 2
-START_LIVES = 3
-PAUSED = 0
-IN_PLAY = 1
-GAME_OVER = 2
-END_OF_LEVEL_DELAY = 150
-GRID_WIDTH = 20
-FRAME_REFRESH = 60
-DISPLAY_FRUIT = FRAME_REFRESH * 7
-CHASE_TIMER = FRAME_REFRESH * 20
-SCATTER_TIMER = FRAME_REFRESH * 10
-FRIGHT_TIMER = FRAME_REFRESH * 10
-CATCH_TIMER = FRAME_REFRESH * 3
-NEW_LIFE_TIMER = FRAME_REFRESH * 3
-DELAY = FRAME_REFRESH
-NEW_LIFE_INTERVAL = 10000
-HOLD = 0
-LEFT = 1
-RIGHT = 2
-UP = 3
-DOWN = 4
-
-WHITE = arcade.color.WHITE
-GREEN = arcade.color.GREEN
-AQUA = arcade.color.AQUA
-RED = arcade.color.RED
-YELLOW = arcade.color.YELLOW
-
-SCORE_FONT_SIZE = 12
-INST_FONT_SIZE = 18
-INFO_FONT_SIZE = 16
-HEADING_FONT_SIZE = 30
-
-sounds = {
-    "music": arcade.load_sound("sounds/MazeTune.mp3"),
-    "extra": arcade.load_sound("sounds/extraLife.wav"),
-    "game_over": arcade.load_sound("sounds/GameOver.wav"),
-    "level": arcade.load_sound("sounds/LevelCompleted.wav"),
-    "energiser": arcade.load_sound("sounds/eatEnergiser.wav"),
-    "fruit": arcade.load_sound("sounds/eatfruit.wav"),
-}
-
-
-class GameView(arcade.Window):
-    def __init__(self):
-        super().__init__(WINDOW_WIDTH, WINDOW_HEIGHT, WINDOW_TITLE)
+
+
+class GameView(Game, arcade.Window):
+    def __init__(
+        self,
+        swarm=0,
+        scale=1,
+        bot=False,
+        telemetry=None,
+        cornering=0,
+        pacing="fixed",
+        rate=FRAME_REFRESH,
+        spin=0.0,
+        threaded=False,
+        share=None,
+        replays=None,
+        collection="default",
+    ):
+        arcade.Window.__init__(
+            self, WINDOW_WIDTH, WINDOW_HEIGHT, WINDOW_TITLE, fixed_frame_cap=5
+        )
         self.background_color = arcade.csscolor.BLACK
         v = pyglet.display.get_display().get_default_screen()
         self.set_location(
@@ -70,47 +74,41 @@ class GameView(arcade.Window):
         self.messages = []
         self.inst = []
         self.game_over_text = []
-
-        self.scene = arcade.Scene()
-        for name, spatial in (
-            ("Lives", False),
-            ("Grid", True),
-            ("Dots", False),
-            ("Fruit", False),
-            ("Ghosts", False),
-            ("Pacman", False),
-        ):
-            self.scene.add_sprite_list(name, spatial)
-
-        self.pacman = None
-        self.fruit_position = (0, 0)
-        defaults = dict(
-            fright_length=0,
-            level=0,
-            score=0,
-            high_score=0,
-            dots_eaten=0,
-            lives=0,
-            new_life_timer=0,
-            chase_timer=0,
-            scatter_timer=0,
-            scatter_count=0,
-            new_life_target=0,
-            ghosts_eaten=0,
-            level_cleared=False,
-            end_of_level_timer=0,
-            current_ghost_mode=0,
-            mode_timer=0,
-            fright_counter=0,
-            game_state=PAUSED,
-            music_playing=None,
+        self.camera = arcade.Camera2D()
+        self.latency = LatencyMeter()
+        self.pacer = Pacer(self, pacing, rate, spin)
+        self.pacer.apply()
+        self.show_pacing = False
+        self.dirty = True
+        self.previous = {}
+        self.pacing_text = arcade.Text(
+            "", 20, WINDOW_HEIGHT - 40, GREEN, SCORE_FONT_SIZE
+        )
+        self.collector = Collector(collection)
+        self.collector_text = arcade.Text(
+            "", 20, WINDOW_HEIGHT - 60, GREEN, SCORE_FONT_SIZE
         )
-        for k, v in defaults.items():
-            setattr(self, k, v)
+        self.picture = None
+        audio.preload()
 
+        self.scores = ScoreBoard()
         self.load_high_score()
         self.set_up_score_line()
-        self.initialise_new_game()
+        Game.__init__(self, swarm, scale, cornering)
+        self.autopilot = Autopilot(layouts=self.layouts) if bot else None
+        self.simulation = None
+        self.replays = replays
+        self.dot_sprites = {d.index: d for d in self.scene["Dots"]}
+        game = self
+        if threaded:
+            game = SimulatedGame(swarm, scale, cornering)
+            self.simulation = Simulation(game, self.autopilot, self.collector)
+            self.autopilot = None
+            audio.claim()
+        if telemetry:
+            game.telemetry = Telemetry(telemetry)
+        if share:
+            game.live_state = LiveState(game, share)
         self.set_instructions()
 
     def _text(self, *args, **kwargs):
@@ -166,22 +164,6 @@ class GameView(arcade.Window):
             )
         )
 
-    def set_for_level(self):
-        self.scatter_count = self.ghosts_eaten = self.dots_eaten = 0
-        self.level_cleared = False
-        self.create_maze()
-        self.pacman.next_direction = HOLD
-        self.current_ghost_mode = Ghost.CHASE
-        self.mode_timer = CHASE_TIMER
-        self.fright_counter = 0
-        if self.level < 6:
-            sp = 100 - (6 - self.level) * 5
-            self.pacman.set_speed_percent(sp)
-            for g in self.scene["Ghosts"]:
-                g.set_speed_percent(sp)
-        self.current_level_text.text = f"Уровень: {self.level}"
-        self.set_fruit_line()
-
     def set_up_score_line(self):
         self.your_score_text = arcade.Text(
             "Ваши очки: 0",
@@ -244,10 +226,10 @@ class GameView(arcade.Window):
                 align="center",
             ),
         ]
+        if self.score > 0:
+            self.scores.submit(self.score, self.level)
         if self.score > self.high_score:
             self.high_score = self.score
-            with open("scores.txt", "w") as f:
-                f.write(str(self.score))
             self.game_over_text.append(
                 self._text(
                     "Поздравляем, новый рекорд!",
@@ -274,23 +256,7 @@ class GameView(arcade.Window):
         )
 
     def load_high_score(self):
-        try:
-            with open("scores.txt", "r") as f:
-                self.high_score = int(f.read())
-        except Exception:
-            self.high_score = 0
-
-    def initialise_new_game(self):
-        self.score = 0
-        self.level = 1
-        self.lives = START_LIVES
-        self.chase_timer = CHASE_TIMER
-        self.scatter_timer = SCATTER_TIMER
-        self.fright_length = FRIGHT_TIMER
-        self.new_life_target = NEW_LIFE_INTERVAL
-        self.set_for_level()
-        self.set_lives_line()
-        self.set_fruit_line()
+        self.high_score = self.scores.high_score()
 
     def set_lives_line(self):
         self.scene["Lives"].clear()
@@ -301,314 +267,289 @@ class GameView(arcade.Window):
             self.scene.add_sprite("Lives", s)
 
     def set_fruit_line(self):
-        self.scene["Fruit"].clear()
-        for i in range(self.level):
+        fruit = self.scene["Fruit"]
+        count = min(self.level, len(Dot.fruit_image))
+        while len(fruit) > count:
+            fruit.pop()
+        for i in range(len(fruit), count):
             f = arcade.Sprite(Dot.fruit_image[i])
             f.center_x = WINDOW_WIDTH - i * 25 - 40
             f.center_y = 25
             self.scene.add_sprite("Fruit", f)
 
-    def add_new_life(self):
-        if self.lives < 5:
-            self.lives += 1
-            self.messages.append(
-                Message("Новая жизнь", (0, 15), RED, INST_FONT_SIZE, 100, True)
-            )
-            self.set_lives_line()
-            sounds["extra"].play(volume=0.15)
-
-    def create_maze(self):
-        self.scene["Grid"].clear()
-        self.scene["Dots"].clear()
-        self.scene["Ghosts"].clear()
-        level = (self.level - 1) % len(maze_layouts)
-        for y, row in enumerate(maze_layouts[level]):
-            for x, c in enumerate(row):
-                if c == "X":
-                    self.scene.add_sprite("Grid", Brick(level, x, y))
-                elif c == "O":
-                    self.scene.add_sprite("Grid", Brick(Brick.OPENING, x, y))
-                elif c == "Y":
-                    if self.pacman is not None:
-                        self.pacman.kill()
-                    self.pacman = PacMan(x, y)
-                    self.scene.add_sprite("Pacman", self.pacman)
-                elif c == ".":
-                    self.scene.add_sprite("Dots", Dot(Dot.DOT, x, y))
-                elif c == "E":
-                    self.scene.add_sprite("Dots", Dot(Dot.ENERGISER, x, y))
-                elif c == "F":
-                    self.fruit_position = (x, y)
-                elif c == "B":
-                    self.scene.add_sprite("Ghosts", Ghost(Ghost.BLINKY, x, y))
-                elif c == "I":
-                    self.scene.add_sprite("Ghosts", Ghost(Ghost.INKY, x, y))
-                elif c == "P":
-                    self.scene.add_sprite("Ghosts", Ghost(Ghost.PINKY, x, y))
-                elif c == "C":
-                    self.scene.add_sprite("Ghosts", Ghost(Ghost.CLYDE, x, y))
-
-    def update_score(self, points):
-        self.score += points
+    def score_changed(self):
         self.your_score_text.text = f"Ваши очки: {self.score}"
-        if self.score >= self.new_life_target:
-            self.new_life_target += NEW_LIFE_INTERVAL
-            self.add_new_life()
-
-    def snap_to_grid(self, pos, speed):
-        ip = round(pos)
-        base = (ip // 20) * 20
-        dist = pos - base
-        t = speed / 1.5
-        if dist >= 20 - t:
-            return ip + 20 - ip % 20
-        if dist <= t:
-            return ip - ip % 20
-        return pos
-
-    def try_to_move(self, direction, obj):
-        if direction != obj.current_direction:
-            obj.center_x = self.snap_to_grid(obj.center_x, obj.speed)
-            obj.center_y = self.snap_to_grid(obj.center_y, obj.speed)
-        vx = obj.speed if direction == RIGHT else -obj.speed if direction == LEFT else 0
-        vy = obj.speed if direction == UP else -obj.speed if direction == DOWN else 0
-        obj.center_x += vx
-        obj.center_y += vy
-        hits = arcade.check_for_collision_with_list(obj, self.scene["Grid"])
-        if hits:
-            b = hits[0]
-            if direction == LEFT:
-                obj.center_x = b.center_x + 20
-            elif direction == RIGHT:
-                obj.center_x = b.center_x - 20
-            elif direction == UP:
-                obj.center_y = b.center_y - 20
-            elif direction == DOWN:
-                obj.center_y = b.center_y + 20
-            return False
-        if obj.current_direction != direction:
-            obj.current_direction = direction
-            obj.change_direction = True
-        return True
-
-    def move_pacman(self, nd):
-        if not self.try_to_move(nd, self.pacman):
-            self.try_to_move(self.pacman.current_direction, self.pacman)
-        if self.pacman.center_x < 2:
-            self.pacman.center_x = WINDOW_WIDTH - 22
-        elif self.pacman.center_x > WINDOW_WIDTH - 22:
-            self.pacman.center_x = 2
-
-    def move_ghost(self, ghost, direction):
-        if not self.try_to_move(direction, ghost):
-            return False
-        ghost.set_direction_image(direction)
-        if ghost.center_x < 2:
-            ghost.center_x = WINDOW_WIDTH - 22
-        elif ghost.center_x > WINDOW_WIDTH - 22:
-            ghost.center_x = 2
-        return True
-
-    def ghost_fright_over(self):
-        self.ghosts_eaten = 0
-        for g in self.scene["Ghosts"]:
-            g.set_default_mode(False)
-        self.mode_timer = self.chase_timer
-
-    def change_ghost_mode(self):
-        if self.scatter_count < 3 and self.current_ghost_mode == Ghost.CHASE:
-            self.scatter_count += 1
-            self.current_ghost_mode = Ghost.SCATTER
-            self.mode_timer = self.scatter_timer
-            for g in self.scene["Ghosts"]:
-                g.set_scatter_mode()
+
+    def lives_changed(self):
+        self.set_lives_line()
+        state = self.picture.state if self.picture else None
+        if state.pacman[3] if state else self.pacman.caught():
+            self.collector.settle()
+
+    def level_started(self):
+        self.current_level_text.text = f"Уровень: {self.level}"
+        self.set_fruit_line()
+        self.collector.settle()
+
+    def level_ended(self):
+        self.collector.collect()
+
+    def game_ended(self):
+        if self.replays:
+            save(self.simulation.game if self.simulation else self, self.replays)
+        self.set_game_over()
+        audio.stop_music()
+        audio.play("game_over")
+        self.collector.collect()
+
+    def show_message(self, text, pos, color, size, time, center):
+        self.messages.append(Message(text, pos, color, size, time, center))
+
+    def present(self, picture):
+        if picture is self.picture:
+            return
+        self.picture = picture
+        state = picture.state
+        if picture.cleared and state.frame >= self.frame:
+            if self.staged is None:
+                self.level_ended()
+                self.staged = StagedLevel(
+                    state.level + 1,
+                    self.layouts,
+                    self.swarm_size,
+                    self.rng,
+                    self.pool,
+                )
+            self.staged.advance()
+        rebuilt = state.level != self.level or state.frame < self.frame
+        if rebuilt:
+            self.level = state.level
+            self.set_for_level()
+            self.dot_sprites = {d.index: d for d in self.scene["Dots"]}
+        self.frame = state.frame
+        if state.score != self.score:
+            self.score = state.score
+            self.score_changed()
+        if state.lives != self.lives:
+            self.lives = state.lives
+            self.lives_changed()
+        if state.state != self.game_state:
+            self.game_state = state.state
+            if state.state == GAME_OVER:
+                self.game_ended()
+            elif state.state == IN_PLAY and not rebuilt:
+                self.collector.settle()
+        if state.dots != self.dot_map:
+            for i, eaten in enumerate(state.dots):
+                if not eaten and self.dot_map[i]:
+                    self.dot_sprites[i].visible = False
+            self.dot_map = bytearray(state.dots)
+        place(self.pacman, picture.pacman)
+        for ghost, view in zip(self.scene["Ghosts"], picture.ghosts):
+            place(ghost, view)
+        if len(picture.bonus) != len(self.scene["Bonus"]):
+            self.scene["Bonus"].clear()
+            for view in picture.bonus:
+                self.scene.add_sprite("Bonus", place(arcade.Sprite(view[2]), view))
+        messages = self.simulation.game.messages
+        while messages:
+            self.show_message(*messages.popleft())
+        if state.pacman[3]:
+            self.latency.cancel()
         else:
-            self.current_ghost_mode = Ghost.CHASE
-            self.mode_timer = self.chase_timer
-            for g in self.scene["Ghosts"]:
-                g.set_default_mode(False)
+            self.latency.updated(state.pacman[2], state.frame)
 
     def on_key_press(self, key, modifiers):
+        self.dirty = True
         if key in (arcade.key.LEFT, arcade.key.A):
-            self.pacman.next_direction = LEFT
+            self.press(LEFT)
         elif key in (arcade.key.RIGHT, arcade.key.D):
-            self.pacman.next_direction = RIGHT
+            self.press(RIGHT)
         elif key in (arcade.key.UP, arcade.key.W):
-            self.pacman.next_direction = UP
+            self.press(UP)
         elif key in (arcade.key.DOWN, arcade.key.S):
-            self.pacman.next_direction = DOWN
+            self.press(DOWN)
         elif key == arcade.key.SPACE and self.game_state != IN_PLAY:
-            self.initialise_new_game()
-            self.game_state = IN_PLAY
+            self.begin()
         elif key == arcade.key.M and self.game_state != IN_PLAY:
-            self.initialise_new_game()
-            self.game_state = IN_PLAY
-            self.music_playing = sounds["music"].play(volume=0.33, loop=True)
-
-    def check_if_eaten_dot(self):
-        hits = arcade.check_for_collision_with_list(self.pacman, self.scene["Dots"])
-        if not hits:
-            return
-        dot = hits[0]
-        self.update_score(dot.score)
-        dot.done = True
-        self.dots_eaten += 1
-        for g in self.scene["Ghosts"]:
-            g.reduce_delay()
-        if dot.dtype == Dot.ENERGISER:
-            sounds["energiser"].play(volume=0.15)
-            for g in self.scene["Ghosts"]:
-                g.set_frightened_mode()
-            Ghost.fright_timer = self.fright_length
-        elif dot.dtype == Dot.FRUIT:
-            sounds["fruit"].play(volume=0.15)
-            self.messages.append(
-                Message(
-                    f"{dot.score}",
-                    (dot.center_x - 10, dot.center_y - 5),
-                    WHITE,
-                    SCORE_FONT_SIZE,
-                    100,
-                    False,
-                )
-            )
-        if self.dots_eaten in (70, 170):
-            self.scene.add_sprite(
-                "Dots",
-                Dot(
-                    Dot.FRUIT,
-                    self.fruit_position[0],
-                    self.fruit_position[1],
-                    self.level,
-                ),
-            )
+            self.begin()
+            audio.play_music()
+        elif key == arcade.key.F3:
+            self.show_pacing = not self.show_pacing
+        elif key == arcade.key.F4 and not self.pacer.idling:
+            self.pacer.cycle()
+
+    def begin(self):
+        if self.simulation is None:
+            self.start()
+        else:
+            self.simulation.send("start")
 
-    def check_if_ghost_collide(self):
-        hits = arcade.check_for_collision_with_list(self.pacman, self.scene["Ghosts"])
-        if not hits:
-            return
-        ghost = hits[0]
-        if ghost.mode == Ghost.FRIGHTENED:
-            if self.ghosts_eaten < 4:
-                self.ghosts_eaten += 1
-            pts = ghost_score[self.ghosts_eaten - 1]
-            self.update_score(pts)
-            self.messages.append(
-                Message(
-                    f"{pts}",
-                    (ghost.center_x - 10, ghost.center_y - 5),
-                    WHITE,
-                    SCORE_FONT_SIZE,
-                    100,
-                    False,
-                )
-            )
-            ghost.return_to_pen()
-        elif ghost.mode != Ghost.CAUGHT:
-            self.pacman.set_caught()
-            self.lives -= 1
-            self.set_lives_line()
+    def press(self, direction):
+        if self.simulation is None:
+            self.steer(direction)
+        else:
+            self.simulation.send("steer", direction)
+        if self.game_state == IN_PLAY:
+            self.latency.pressed(direction, self.frame)
 
     def on_update(self, delta_time):
-        if self.game_state != IN_PLAY:
-            return
-        if self.pacman.done:
-            if self.lives < 1:
-                self.set_game_over()
-                self.game_state = GAME_OVER
-                if self.music_playing is not None:
-                    arcade.stop_sound(self.music_playing)
-                sounds["game_over"].play(volume=0.05)
+        self.pacer.updated()
+        if self.simulation is not None:
+            self.present(self.simulation.snapshots.latest())
+            audio.flush()
+        idle = self.game_state != IN_PLAY
+        if idle != self.pacer.idling:
+            if idle:
+                self.pacer.rest()
             else:
-                self.pacman.return_to_start()
-                self.pacman.next_direction = HOLD
-                for g in self.scene["Ghosts"]:
-                    g.jump_to_start()
-                self.ghost_fright_over()
+                self.pacer.apply()
+            self.dirty = True
+
+    def on_resize(self, width, height):
+        self.dirty = True
+        return super().on_resize(width, height)
+
+    def on_expose(self):
+        self.dirty = True
+
+    def draw(self, delta_time):
+        if self.pacer.idling and not self.dirty:
             return
+        self.dirty = False
+        super().draw(delta_time)
 
-        if (
-            not self.level_cleared
-            and self.pacman.next_direction != HOLD
-            and not self.pacman.caught()
-        ):
-            self.move_pacman(self.pacman.next_direction)
-
-        self.check_if_eaten_dot()
-
-        if not self.pacman.caught():
-            if len(self.scene["Dots"]) == 0:
-                if not self.level_cleared:
-                    self.level_cleared = True
-                    self.end_of_level_timer = END_OF_LEVEL_DELAY
-                    sounds["level"].play(volume=0.15)
-                self.end_of_level_timer -= 1
-                if self.end_of_level_timer <= 0:
-                    self.level += 1
-                    self.set_for_level()
-                    self.chase_timer += FRAME_REFRESH * 2
-                    if self.scatter_timer > FRIGHT_TIMER * 5:
-                        self.scatter_timer -= FRAME_REFRESH / 2
-                    if self.fright_length > FRAME_REFRESH * 5:
-                        self.fright_length -= FRAME_REFRESH / 2
-                else:
-                    return
-
-            self.check_if_ghost_collide()
-
-            if Ghost.fright_timer > 0:
-                Ghost.fright_timer -= 1
-                if Ghost.fright_timer <= 0:
-                    self.ghost_fright_over()
-            else:
-                self.mode_timer -= 1
-                if self.mode_timer <= 0:
-                    self.change_ghost_mode()
-
-            for ghost in self.scene["Ghosts"]:
-                d = ghost.set_direction(self.pacman)
-                if not self.move_ghost(ghost, d):
-                    if not self.move_ghost(ghost, ghost.current_direction):
-                        order = ghost.get_order()
-                        moved = False
-                        for o in order:
-                            if (
-                                (o == LEFT and ghost.current_direction == RIGHT)
-                                or (o == RIGHT and ghost.current_direction == LEFT)
-                                or (o == UP and ghost.current_direction == DOWN)
-                                or (o == DOWN and ghost.current_direction == UP)
-                            ):
-                                continue
-                            if self.move_ghost(ghost, o):
-                                moved = True
-                                break
-                        if not moved:
-                            alt = {LEFT: RIGHT, RIGHT: LEFT, UP: DOWN, DOWN: UP}
-                            self.move_ghost(
-                                ghost, alt.get(ghost.current_direction, LEFT)
-                            )
-
-        self.scene.update(delta_time)
+    def on_fixed_update(self, delta_time):
+        if self.pacer.idling:
+            self.pacer.drop_backlog()
+        if self.simulation is not None:
+            return
+        if self.autopilot is not None and self.game_state == IN_PLAY:
+            self.steer(self.autopilot.choose(self))
+        self.previous = {s: s.position for name in MOVING for s in self.scene[name]}
+        self.step(delta_time)
+        self.collector.tick()
+        if self.pacman.next_direction == HOLD:
+            self.latency.cancel()
+        else:
+            self.latency.updated(self.pacman.current_direction, self.frame)
+
+    def interpolate(self, alpha):
+        moved = []
+        for sprite, (x, y) in self.previous.items():
+            cx, cy = sprite.position
+            if (cx, cy) != (x, y) and abs(cx - x) + abs(cy - y) < GRID_WIDTH:
+                moved.append((sprite, cx, cy))
+                sprite.position = (x + (cx - x) * alpha, y + (cy - y) * alpha)
+        return moved
+
+    def follow_pacman(self):
+        half_w, half_h = WINDOW_WIDTH / 2, WINDOW_HEIGHT / 2
+        x = min(max(self.pacman.center_x, half_w), self.world[0] - half_w)
+        y = min(max(self.pacman.center_y, half_h), self.world[1] - half_h)
+        self.camera.position = (x, y)
+        return x - half_w, y - half_h, x + half_w, y + half_h
+
+    def draw_world(self):
+        view = self.follow_pacman()
+        with self.camera.activate():
+            self.layers["Grid"].draw(*view)
+            self.layers["Dots"].draw(*view)
+            for name in ("Bonus", "Ghosts", "Pacman"):
+                self.scene[name].draw()
+            self.draw_messages()
+        self.scene["Lives"].draw()
+        self.scene["Fruit"].draw()
+
+    def draw_messages(self):
+        for m in list(self.messages):
+            m.draw()
+            if m.done:
+                self.messages.remove(m)
 
     def on_draw(self):
         self.clear()
         if self.game_state == IN_PLAY:
-            self.scene.draw()
-            for m in list(self.messages):
-                m.draw()
-                if m.done:
-                    self.messages.remove(m)
+            moved = self.interpolate(min(1.0, GLOBAL_FIXED_CLOCK.fraction))
+            if self.layers is None:
+                self.scene.draw()
+                self.draw_messages()
+            else:
+                self.draw_world()
+            for sprite, x, y in moved:
+                sprite.position = (x, y)
         if self.game_state == IN_PLAY:
             self.score_batch.draw()
         elif self.game_state == GAME_OVER:
             self.game_over.draw()
         elif self.game_state == PAUSED:
             self.instructions.draw()
+        if self.show_pacing:
+            if self.pacer.draws.count % 15 == 0:
+                self.pacing_text.text = self.pacer.summary()
+                self.collector_text.text = self.collector.summary()
+            self.pacing_text.draw()
+            self.collector_text.draw()
+        self.latency.drawn()
+        self.pacer.drawn()
+
+
+def place(sprite, view):
+    sprite.position = view[0], view[1]
+    sprite.texture = view[2]
+    return sprite
 
 
 def main():
-    GameView()
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--swarm", type=int, default=0, metavar="GHOSTS")
+    parser.add_argument("--scale", type=int, default=1, metavar="MAZES")
+    parser.add_argument("--bot", action="store_true")
+    parser.add_argument("--telemetry", metavar="PATH")
+    parser.add_argument("--cornering", type=int, default=0, metavar="PIXELS")
+    parser.add_argument("--latency", action="store_true")
+    parser.add_argument("--pacing", choices=MODES, default="fixed")
+    parser.add_argument("--rate", type=int, default=FRAME_REFRESH, metavar="FPS")
+    parser.add_argument("--spin", type=float, default=0, metavar="MS")
+    parser.add_argument("--frame-stats", action="store_true")
+    parser.add_argument("--threaded", action="store_true")
+    parser.add_argument("--share", metavar="NAME")
+    parser.add_argument("--record", metavar="DIR")
+    parser.add_argument("--gc", choices=POLICIES, default="default")
+    parser.add_argument("--alloc-stats", action="store_true")
+    args = parser.parse_args()
+    window = GameView(
+        args.swarm,
+        args.scale,
+        args.bot,
+        args.telemetry,
+        args.cornering,
+        args.pacing,
+        args.rate,
+        args.spin / 1000,
+        args.threaded,
+        args.share,
+        args.record,
+        args.gc,
+    )
+    if window.simulation is not None:
+        window.simulation.start()
     arcade.run()
+    if window.simulation is not None:
+        window.simulation.stop()
+    if args.latency:
+        print("\n".join(window.latency.report()))
+    if args.frame_stats:
+        print("\n".join(window.pacer.report()))
+    if args.alloc_stats:
+        print("\n".join(window.collector.report()))
+    window.collector.close()
+    window.scores.close()
+    game = window.simulation.game if window.simulation else window
+    if game.telemetry is not None:
+        game.telemetry.close()
+    if game.live_state is not None:
+        game.live_state.close()
 
 
 if __name__ == "__main__":
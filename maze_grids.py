@@ -136,3 +136,22 @@ maze_layouts = [
         "XXXXXXXXXXXXXXXXXXXXXXXXXXXX",
     ],
 ]
+
+
+def scale_layout(layout, across, down):
+    markers = str.maketrans("YBIPCF", "      ")
+    doors = [
+        x
+        for x in range(len(layout[0]))
+        if x % 6 == 1 and layout[1][x] == "." and layout[-2][x] == "."
+    ]
+    rows = []
+    for j in range(down):
+        for y, row in enumerate(layout):
+            if (y == 0 and j > 0) or (y == len(layout) - 1 and j < down - 1):
+                row = "".join("." if x in doors else c for x, c in enumerate(row))
+            line = row + row.translate(markers) * (across - 1)
+            if j > 0:
+                line = line.translate(markers)
+            rows.append(line)
+    return rows
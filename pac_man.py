@@ -1,11 +1,14 @@
 import arcade
 
+import audio
+from animation import schedule
 from constants import FRAME_REFRESH, HOLD, WINDOW_HEIGHT
+from grid import tile_position
 
 player_max_speed = 3.66
 caught_timer_default = int(FRAME_REFRESH * 1.5)
+chomp_frames = 11
 
-life_lost = arcade.load_sound("sounds/lifeLost.wav")
 pacman_whole = arcade.load_texture("images/pacWhole.png")
 
 pacman_moving = [
@@ -24,19 +27,38 @@ caught_image = [
     arcade.load_texture("images/lost6.png"),
 ]
 
+chomp = [
+    schedule((image, chomp_frames), (pacman_whole, chomp_frames))
+    for image in pacman_moving
+]
+
+dying = schedule(
+    (pacman_whole, 6),
+    (caught_image[0], 12),
+    (caught_image[1], 18),
+    (caught_image[2], 12),
+    (caught_image[3], 18),
+    (caught_image[4], 12),
+    (caught_image[5], 18),
+)
+
 
 class PacMan(arcade.Sprite):
-    def __init__(self, x, y):
-        x = x * 20 + 10
-        y = WINDOW_HEIGHT - (y * 20 + 40)
-        super().__init__(pacman_whole, 18 / 20, x, y)
-        self.whole = True
+    def __init__(self, x, y, height=WINDOW_HEIGHT):
+        super().__init__(pacman_whole, 18 / 20)
+        self.reset(x, y, height)
+
+    def reset(self, x, y, height=WINDOW_HEIGHT):
+        x, y = tile_position(x, y, height)
+        x -= 10
+        self.position = (x, y)
+        self.texture = pacman_whole
         self.start_position = (x, y)
         self.speed = player_max_speed
         self.speed_for_level = player_max_speed
         self._caught = False
         self.caught_timer = 0
-        self.frame_count = 0
+        self.phase = chomp_frames
         self.current_direction = HOLD
         self.next_direction = HOLD
         self.change_direction = False
@@ -50,10 +72,10 @@ class PacMan(arcade.Sprite):
     def set_caught(self):
         self._caught = True
         self.next_direction = HOLD
-        life_lost.play(volume=0.15)
+        audio.play("life_lost")
         self.caught_timer = caught_timer_default
+        self.phase = chomp_frames
         self.texture = pacman_whole
-        self.whole = True
 
     def caught(self):
         return self._caught
@@ -63,8 +85,8 @@ class PacMan(arcade.Sprite):
         self.center_y = self.start_position[1]
         self.speed = self.speed_for_level
         self.current_direction = HOLD
+        self.phase = chomp_frames
         self.texture = pacman_whole
-        self.whole = True
         self._caught = False
         self.done = False
 
@@ -73,20 +95,15 @@ class PacMan(arcade.Sprite):
             self.caught_timer -= 1
             if self.caught_timer <= -6:
                 self.done = True
-            elif self.caught_timer % 6 == 0:
-                self.texture = caught_image[5 - self.caught_timer // 15]
+            else:
+                self.texture = dying[caught_timer_default - self.caught_timer]
+        elif self.current_direction == HOLD:
+            self.texture = pacman_whole
         else:
-            if self.current_direction == HOLD:
-                self.texture = pacman_whole
+            if self.change_direction:
+                self.change_direction = False
+                self.phase = chomp_frames if self.phase < chomp_frames else 0
             else:
-                self.frame_count += 1
-                if self.frame_count > 10 or self.change_direction:
-                    self.frame_count = 0
-                    self.change_direction = False
-                    if self.whole:
-                        self.texture = pacman_moving[self.current_direction - 1]
-                        self.whole = False
-                    else:
-                        self.texture = pacman_whole
-                        self.whole = True
+                self.phase = (self.phase + 1) % (chomp_frames * 2)
+            self.texture = chomp[self.current_direction - 1][self.phase]
         super().update(delta_time)
@@ -0,0 +1,140 @@
+import time
+from collections import deque
+
+import pyglet
+from arcade.clock import GLOBAL_CLOCK, GLOBAL_FIXED_CLOCK
+
+from constants import FRAME_REFRESH
+
+MODES = ("fixed", "vsync", "uncapped")
+FASTEST = 1 / 1000
+IDLE = 1 / 10
+
+
+class FrameStats:
+    def __init__(self, target, buckets=50, window=FRAME_REFRESH * 10):
+        self.target = target
+        self.histogram = [0] * (buckets + 1)
+        self.recent = deque(maxlen=window)
+        self.last = None
+        self.count = 0
+        self.missed = 0
+        self.total = 0.0
+        self.squares = 0.0
+
+    def tick(self, now):
+        if self.last is not None:
+            interval = now - self.last
+            self.histogram[min(int(interval * 1000), len(self.histogram) - 1)] += 1
+            self.recent.append(interval)
+            self.count += 1
+            self.total += interval
+            self.squares += interval * interval
+            if interval > self.target * 1.5:
+                self.missed += 1
+        self.last = now
+
+    def mean(self):
+        return self.total / self.count if self.count else 0.0
+
+    def jitter(self):
+        if self.count < 2:
+            return 0.0
+        mean = self.mean()
+        return max(0.0, self.squares / self.count - mean * mean) ** 0.5
+
+    def percentile(self, q):
+        limit = q * self.count
+        seen = 0
+        for ms, count in enumerate(self.histogram):
+            seen += count
+            if seen >= limit:
+                return ms
+        return len(self.histogram) - 1
+
+    def rate(self):
+        if not self.recent:
+            return 0.0
+        return len(self.recent) / sum(self.recent)
+
+    def report(self, name):
+        lines = [
+            f"{name}: {self.count} frames  mean {self.mean() * 1000:.2f} ms"
+            f"  jitter {self.jitter() * 1000:.2f} ms  missed {self.missed}"
+            f"  p50 {self.percentile(0.5)} ms  p99 {self.percentile(0.99)} ms"
+        ]
+        for ms, count in enumerate(self.histogram):
+            if count:
+                label = f"{ms:2d}" if ms < len(self.histogram) - 1 else f"{ms}+"
+                lines.append(f"  {label} ms {count:7d} {count / self.count:6.1%}")
+        return lines
+
+
+class Pacer:
+    def __init__(self, window, mode="fixed", rate=FRAME_REFRESH, spin=0.0):
+        self.window = window
+        self.mode = mode
+        self.period = 1 / rate
+        self.spin = spin
+        self.interval = self.period
+        self.idling = False
+        self.deadline = 0.0
+        self.updates = FrameStats(self.period)
+        self.draws = FrameStats(self.period)
+
+    def apply(self, mode=None):
+        self.mode = mode or self.mode
+        self.idling = False
+        self.window.set_vsync(self.mode == "vsync")
+        self.interval = self.period if self.mode == "fixed" else FASTEST
+        self.window.set_update_rate(self.interval)
+        self.window.set_draw_rate(self.interval)
+        pyglet.clock.unschedule(self.wait)
+        if self.spin:
+            pyglet.clock.schedule(self.wait)
+        self.updates.last = self.draws.last = None
+
+    def rest(self):
+        self.idling = True
+        self.window.set_vsync(False)
+        self.interval = IDLE
+        self.window.set_update_rate(IDLE)
+        self.window.set_draw_rate(IDLE)
+        pyglet.clock.unschedule(self.wait)
+
+    def drop_backlog(self):
+        GLOBAL_FIXED_CLOCK._elapsed_time = GLOBAL_CLOCK.time
+
+    def cycle(self):
+        self.apply(MODES[(MODES.index(self.mode) + 1) % len(MODES)])
+
+    def wait(self, delta_time):
+        remaining = self.deadline - time.perf_counter() - self.spin
+        if remaining > 0:
+            time.sleep(remaining)
+
+    def updated(self):
+        if self.idling:
+            return
+        now = time.perf_counter()
+        self.updates.tick(now)
+        self.deadline = now + self.interval
+
+    def drawn(self):
+        if not self.idling:
+            self.draws.tick(time.perf_counter())
+
+    def summary(self):
+        draws = self.draws
+        recent = draws.recent
+        worst = max(recent) * 1000 if recent else 0.0
+        return (
+            f"{self.mode} {draws.rate():.0f} fps  worst {worst:.1f} ms"
+            f"  jitter {draws.jitter() * 1000:.2f} ms  missed {draws.missed}"
+        )
+
+    def report(self):
+        lines = [f"mode: {self.mode}"]
+        lines += self.updates.report("update")
+        lines += self.draws.report("draw")
+        return lines
@@ -0,0 +1,39 @@
+import arcade
+
+from brick import Brick
+from dot import Dot
+from ghost import Ghost
+from pac_man import PacMan
+
+
+class SpritePool:
+    def __init__(self):
+        self.free = {Brick: [], Dot: [], Ghost: [], PacMan: []}
+        self.lists = {True: [], False: []}
+        self.created = 0
+        self.reused = 0
+
+    def take(self, kind, *args):
+        free = self.free[kind]
+        if not free:
+            self.created += 1
+            return kind(*args)
+        self.reused += 1
+        sprite = free.pop()
+        sprite.reset(*args)
+        return sprite
+
+    def sprite_list(self, use_spatial_hash=False):
+        free = self.lists[use_spatial_hash]
+        if free:
+            return free.pop()
+        return arcade.SpriteList(use_spatial_hash=use_spatial_hash, lazy=True)
+
+    def release(self, sprites, sprite_lists=()):
+        for sprite_list in sprite_lists:
+            sprite_list.clear()
+            self.lists[sprite_list.spatial_hash is not None].append(sprite_list)
+        for sprite in sprites:
+            sprite.remove_from_sprite_lists()
+            self.free[type(sprite)].append(sprite)
+        sprites.clear()
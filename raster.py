@@ -0,0 +1,161 @@
+import argparse
+import os
+import random
+import shlex
+import subprocess
+import sys
+
+import numpy as np
+from PIL import Image
+
+import audio
+from constants import IN_PLAY, LEFT, RIGHT, UP, DOWN
+from game import Game
+
+
+class Rasterizer:
+    def __init__(self, game):
+        self.game = game
+        self.sprites = {}
+        self.level_key = None
+        self.base = None
+        self.layer = None
+        self.dot_rects = {}
+        self.dot_map = b""
+
+    def sprite_pixels(self, sprite):
+        key = (id(sprite.texture), sprite.width, sprite.height)
+        pixels = self.sprites.get(key)
+        if pixels is None:
+            image = sprite.texture.image.convert("RGBA")
+            size = (max(1, round(sprite.width)), max(1, round(sprite.height)))
+            if image.size != size:
+                image = image.resize(size, Image.NEAREST)
+            rgba = np.asarray(image, dtype=np.float32) / 255
+            pixels = self.sprites[key] = (rgba[..., :3] * rgba[..., 3:], rgba[..., 3:])
+        return pixels
+
+    def rect(self, sprite, shape):
+        h, w = shape[:2]
+        left = round(sprite.center_x - sprite.width / 2)
+        top = self.height - round(sprite.center_y + sprite.height / 2)
+        return left, top, left + w, top + h
+
+    def blend(self, target, sprite):
+        color, alpha = self.sprite_pixels(sprite)
+        left, top, right, bottom = self.rect(sprite, color.shape)
+        x0, y0 = max(left, 0), max(top, 0)
+        x1, y1 = min(right, self.width), min(bottom, self.height)
+        if x0 >= x1 or y0 >= y1:
+            return
+        src = (slice(y0 - top, y1 - top), slice(x0 - left, x1 - left))
+        dst = target[y0:y1, x0:x1]
+        dst *= 1 - alpha[src]
+        dst += color[src]
+
+    def prepare_level(self):
+        self.width, self.height = self.game.world
+        self.base = np.zeros((self.height, self.width, 3), dtype=np.float32)
+        for sprite in self.game.scene["Grid"]:
+            self.blend(self.base, sprite)
+        self.layer = self.base.copy()
+        self.dot_rects = {}
+        for dot in self.game.scene["Dots"]:
+            if not dot.visible:
+                continue
+            self.blend(self.layer, dot)
+            self.dot_rects[dot.index] = self.rect(dot, self.sprite_pixels(dot)[0].shape)
+        self.dot_map = bytes(self.game.dot_map)
+
+    def clear_eaten(self):
+        dot_map = self.game.dot_map
+        if dot_map == self.dot_map:
+            return
+        for i, (was, now) in enumerate(zip(self.dot_map, dot_map)):
+            if was and not now and i in self.dot_rects:
+                left, top, right, bottom = self.dot_rects[i]
+                left, top = max(left, 0), max(top, 0)
+                self.layer[top:bottom, left:right] = self.base[top:bottom, left:right]
+        self.dot_map = bytes(dot_map)
+
+    def render(self):
+        if self.game.generation != self.level_key:
+            self.level_key = self.game.generation
+            self.prepare_level()
+        self.clear_eaten()
+        frame = self.layer.copy()
+        for name in ("Bonus", "Ghosts", "Pacman", "Lives", "Fruit"):
+            for sprite in self.game.scene[name]:
+                if sprite.visible:
+                    self.blend(frame, sprite)
+        return (np.clip(frame, 0, 1) * 255).astype(np.uint8)
+
+
+class PngWriter:
+    def __init__(self, directory):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.count = 0
+
+    def write(self, frame):
+        self.count += 1
+        path = os.path.join(self.directory, f"frame_{self.count:06d}.png")
+        Image.fromarray(frame).save(path)
+
+    def close(self):
+        pass
+
+
+class PipeWriter:
+    def __init__(self, command):
+        self.process = None
+        if command == "-":
+            self.stream = sys.stdout.buffer
+        else:
+            self.process = subprocess.Popen(shlex.split(command), stdin=subprocess.PIPE)
+            self.stream = self.process.stdin
+
+    def write(self, frame):
+        self.stream.write(frame.tobytes())
+
+    def close(self):
+        self.stream.flush()
+        if self.process is not None:
+            self.stream.close()
+            self.process.wait()
+
+
+def capture(game, writer, frames, every=1, seed=0):
+    rng = random.Random(seed)
+    rasterizer = Rasterizer(game)
+    game.game_state = IN_PLAY
+    for i in range(frames):
+        if i % 20 == 0:
+            game.steer(rng.choice((LEFT, RIGHT, UP, DOWN)))
+        game.step()
+        if i % every == 0:
+            writer.write(rasterizer.render())
+        if game.game_state != IN_PLAY:
+            break
+    writer.close()
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--frames", type=int, default=600)
+    parser.add_argument("--every", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--png", metavar="DIR")
+    parser.add_argument("--raw", metavar="COMMAND")
+    args = parser.parse_args()
+    audio.enabled = False
+    game = Game()
+    if args.raw:
+        writer = PipeWriter(args.raw)
+    else:
+        writer = PngWriter(args.png or "frames")
+    capture(game, writer, args.frames, args.every, args.seed)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import audio
+from constants import GAME_OVER, IN_PLAY
+from game import Game
+from scores import ScoreBoard
+
+
+def recording(game):
+    return {
+        "seed": game.seed,
+        "swarm": game.swarm_size,
+        "scale": game.scaling,
+        "cornering": game.cornering,
+        "inputs": [value for event in game.inputs for value in event],
+        "frames": game.frame,
+        "score": game.score,
+        "level": game.level,
+        "ghost_scores": game.ghost_scores,
+    }
+
+
+def save(game, directory):
+    os.makedirs(directory, exist_ok=True)
+    stamp = time.strftime("%Y%m%d-%H%M%S")
+    path = os.path.join(directory, f"{stamp}-{game.seed}.json")
+    with open(path, "w") as f:
+        json.dump(recording(game), f, separators=(",", ":"))
+    return path
+
+
+def simulate(claim):
+    game = Game(claim["swarm"], claim["scale"], claim["cornering"])
+    game.start(claim["seed"])
+    inputs = claim["inputs"]
+    i = 0
+    while game.game_state == IN_PLAY and game.frame < claim["frames"]:
+        while i < len(inputs) and inputs[i] == game.frame:
+            game.steer(inputs[i + 1])
+            i += 2
+        game.step()
+    return game
+
+
+def verify(claim):
+    game = simulate(claim)
+    got = (game.frame, game.score, game.level, game.ghost_scores)
+    wanted = (claim["frames"], claim["score"], claim["level"], claim["ghost_scores"])
+    return game.game_state == GAME_OVER and got == wanted, got
+
+
+def verify_file(path):
+    try:
+        with open(path) as f:
+            claim = json.load(f)
+        ok, got = verify(claim)
+    except (OSError, ValueError, KeyError, TypeError) as e:
+        return path, False, None, str(e)
+    return path, ok, claim, f"frame {got[0]} score {got[1]} level {got[2]}"
+
+
+def init_worker():
+    audio.enabled = False
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("files", nargs="+")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--scores", metavar="PATH")
+    args = parser.parse_args()
+    audio.enabled = False
+    board = ScoreBoard(args.scores) if args.scores else None
+    accepted = 0
+    started = time.perf_counter()
+    with ProcessPoolExecutor(args.workers, initializer=init_worker) as pool:
+        for path, ok, claim, result in pool.map(verify_file, args.files):
+            if ok:
+                accepted += 1
+                print(f"ok {path}: {result}")
+                if board is not None:
+                    board.submit(claim["score"], claim["level"])
+            else:
+                print(f"REJECTED {path}: {result}")
+    elapsed = time.perf_counter() - started
+    if board is not None:
+        board.close()
+    print(
+        f"{accepted}/{len(args.files)} accepted in {elapsed:.1f} s, "
+        f"{len(args.files) / elapsed * 60:.0f} sessions per minute"
+    )
+
+
+if __name__ == "__main__":
+    main()
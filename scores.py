@@ -0,0 +1,110 @@
+import bisect
+import os
+import queue
+import threading
+from datetime import date
+
+LOG_FILE = "scores.log"
+LEGACY_FILE = "scores.txt"
+
+
+def parse_entry(line):
+    parts = line.split()
+    if len(parts) != 3:
+        return None
+    try:
+        return int(parts[0]), int(parts[1]), date.fromisoformat(parts[2]).isoformat()
+    except ValueError:
+        return None
+
+
+def format_entry(entry):
+    return f"{entry[0]} {entry[1]} {entry[2]}\n"
+
+
+def rank(entry):
+    return -entry[0], -entry[1], entry[2]
+
+
+class ScoreBoard:
+    def __init__(self, path=LOG_FILE):
+        self.path = path
+        self.entries = []
+        self.malformed = 0
+        self.lock = threading.Lock()
+        self.queue = queue.Queue()
+        self.load()
+        if self.malformed:
+            self.compact()
+        self.writer = threading.Thread(target=self.write_loop, daemon=True)
+        self.writer.start()
+
+    def load(self):
+        try:
+            with open(self.path) as f:
+                for line in f:
+                    entry = parse_entry(line)
+                    if entry is None:
+                        self.malformed += 1
+                    else:
+                        self.insert(entry)
+        except FileNotFoundError:
+            self.import_legacy()
+
+    def import_legacy(self):
+        try:
+            with open(LEGACY_FILE) as f:
+                score = int(f.read())
+        except (OSError, ValueError):
+            return
+        entry = (score, 0, date.today().isoformat())
+        self.insert(entry)
+        self.queue.put(entry)
+
+    def insert(self, entry):
+        with self.lock:
+            bisect.insort(self.entries, entry, key=rank)
+
+    def submit(self, score, level):
+        entry = (score, level, date.today().isoformat())
+        self.insert(entry)
+        self.queue.put(entry)
+
+    def high_score(self):
+        with self.lock:
+            return self.entries[0][0] if self.entries else 0
+
+    def best(self, count=10, level=None, day=None):
+        entries = []
+        with self.lock:
+            for e in self.entries:
+                if (level is None or e[1] == level) and (day is None or e[2] == day):
+                    entries.append(e)
+                    if len(entries) == count:
+                        break
+        return entries
+
+    def write_loop(self):
+        while True:
+            entry = self.queue.get()
+            if entry is None:
+                break
+            with open(self.path, "a") as f:
+                f.write(format_entry(entry))
+                f.flush()
+                os.fsync(f.fileno())
+
+    def compact(self):
+        with self.lock:
+            entries = list(self.entries)
+        tmp = self.path + ".tmp"
+        with open(tmp, "w") as f:
+            f.writelines(format_entry(e) for e in entries)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.path)
+        self.malformed = 0
+
+    def close(self):
+        self.queue.put(None)
+        self.writer.join()
@@ -0,0 +1,197 @@
+import argparse
+import asyncio
+import json
+import random
+import time
+
+import audio
+from constants import FRAME_REFRESH, IN_PLAY, LEFT, RIGHT, UP, DOWN
+from game import Game
+
+TICK = 1 / FRAME_REFRESH
+HIGH_LOAD = 0.9
+LOW_LOAD = 0.5
+MAX_STRIDE = 8
+SHED_COOLDOWN = FRAME_REFRESH
+SEND_BUFFER = 64 * 1024
+
+directions = {"L": LEFT, "R": RIGHT, "U": UP, "D": DOWN}
+
+
+class Session:
+    def __init__(self, writer):
+        self.game = Game()
+        self.game.game_state = IN_PLAY
+        self.writer = writer
+        self.last_dots = None
+
+    def state_message(self):
+        s = self.game.snapshot()
+        message = {
+            "f": s.frame,
+            "st": s.state,
+            "s": s.score,
+            "l": s.lives,
+            "v": s.level,
+            "p": s.pacman,
+            "g": s.ghosts,
+        }
+        if s.dots != self.last_dots:
+            self.last_dots = s.dots
+            message["d"] = s.dots.hex()
+        return (json.dumps(message, separators=(",", ":")) + "\n").encode()
+
+    def send(self):
+        if self.writer.transport.get_write_buffer_size() < SEND_BUFFER:
+            self.writer.write(self.state_message())
+
+    def command(self, text):
+        if text in directions:
+            self.game.steer(directions[text])
+        elif text == "N" and self.game.game_state != IN_PLAY:
+            self.game.start()
+
+
+class GameServer:
+    def __init__(self, max_sessions=256):
+        self.max_sessions = max_sessions
+        self.sessions = []
+        self.load = 0.0
+        self.stride = 1
+        self.ticks = 0
+        self.cooldown = 0
+
+    def accepting(self):
+        return len(self.sessions) < self.max_sessions and self.load < HIGH_LOAD
+
+    async def handle(self, reader, writer):
+        if not self.accepting():
+            writer.write(b'{"error":"full"}\n')
+            await writer.drain()
+            writer.close()
+            return
+        session = Session(writer)
+        self.sessions.append(session)
+        try:
+            while line := await reader.readline():
+                session.command(line.decode(errors="replace").strip())
+        except ConnectionError:
+            pass
+        finally:
+            if session in self.sessions:
+                self.sessions.remove(session)
+            writer.close()
+
+    def shed(self, cost):
+        keep = max(1, int(len(self.sessions) * HIGH_LOAD / cost))
+        while len(self.sessions) > keep:
+            session = self.sessions.pop()
+            session.writer.write(b'{"error":"shed"}\n')
+            session.writer.close()
+        self.load = HIGH_LOAD
+        self.cooldown = SHED_COOLDOWN
+
+    def tick(self):
+        start = time.perf_counter()
+        for session in self.sessions:
+            session.game.step(TICK)
+        if self.ticks % self.stride == 0:
+            for session in self.sessions:
+                session.send()
+        self.ticks += 1
+        cost = (time.perf_counter() - start) / TICK
+        self.load = self.load * 0.9 + cost * 0.1
+        if self.cooldown:
+            self.cooldown -= 1
+        elif self.load > HIGH_LOAD and self.stride < MAX_STRIDE:
+            self.stride *= 2
+        elif self.load < LOW_LOAD and self.stride > 1:
+            self.stride //= 2
+        elif self.load > 1 and cost > 1 and self.stride == MAX_STRIDE:
+            self.shed(cost)
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        deadline = loop.time()
+        while True:
+            self.tick()
+            deadline += TICK
+            delay = deadline - loop.time()
+            if delay < -TICK:
+                deadline = loop.time()
+            await asyncio.sleep(max(0.0, delay))
+
+    async def serve(self, host, port):
+        server = await asyncio.start_server(self.handle, host, port)
+        async with server:
+            await self.run()
+
+
+async def loopback(host, port, seconds):
+    reader, writer = await asyncio.open_connection(host, port)
+    received = 0
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        line = await reader.readline()
+        if not line or b"error" in line:
+            break
+        received += 1
+        if received % 15 == 0:
+            writer.write(random.choice("LRUD").encode() + b"\n")
+    writer.close()
+    return received
+
+
+async def loopback_test(sessions, seconds, port):
+    server = GameServer()
+    listener = await asyncio.start_server(server.handle, "127.0.0.1", port)
+    ticker = asyncio.create_task(server.run())
+    counts = await asyncio.gather(
+        *(loopback("127.0.0.1", port, seconds) for _ in range(sessions))
+    )
+    ticker.cancel()
+    listener.close()
+    return counts, server
+
+
+def bench(sessions, ticks):
+    games = [Game() for _ in range(sessions)]
+    for g in games:
+        g.game_state = IN_PLAY
+    start = time.perf_counter()
+    for i in range(ticks):
+        for g in games:
+            if i % 15 == 0:
+                g.steer(random.choice((LEFT, RIGHT, UP, DOWN)))
+            g.step(TICK)
+    per_step = (time.perf_counter() - start) / (sessions * ticks)
+    return per_step, int(TICK / per_step)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--max-sessions", type=int, default=256)
+    parser.add_argument("--bench", type=int, metavar="SESSIONS")
+    parser.add_argument("--loopback", type=int, metavar="SESSIONS")
+    parser.add_argument("--seconds", type=float, default=5)
+    args = parser.parse_args()
+    audio.enabled = False
+
+    if args.bench:
+        per_step, capacity = bench(args.bench, int(args.seconds * FRAME_REFRESH))
+        print(f"{per_step * 1e6:.0f} us per session tick")
+        print(f"{capacity} sessions per core at {FRAME_REFRESH} Hz")
+    elif args.loopback:
+        counts, server = asyncio.run(
+            loopback_test(args.loopback, args.seconds, args.port)
+        )
+        print(f"states per client: min {min(counts)} max {max(counts)}")
+        print(f"load {server.load:.2f} stride {server.stride}")
+    else:
+        asyncio.run(GameServer(args.max_sessions).serve(args.host, args.port))
+
+
+if __name__ == "__main__":
+    main()
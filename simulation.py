@@ -0,0 +1,91 @@
+import threading
+import time
+from collections import deque, namedtuple
+
+from constants import FRAME_REFRESH, IN_PLAY
+from game import Game
+
+Picture = namedtuple("Picture", "state pacman ghosts bonus cleared")
+
+
+def sprite_view(sprite):
+    return sprite.center_x, sprite.center_y, sprite.texture
+
+
+def capture(game):
+    return Picture(
+        game.snapshot(),
+        sprite_view(game.pacman),
+        tuple(sprite_view(g) for g in game.scene["Ghosts"]),
+        tuple(sprite_view(b) for b in game.scene["Bonus"]),
+        game.level_cleared,
+    )
+
+
+class Snapshots:
+    def __init__(self):
+        self.slots = [None, None]
+        self.front = 0
+
+    def publish(self, picture):
+        back = 1 - self.front
+        self.slots[back] = picture
+        self.front = back
+
+    def latest(self):
+        return self.slots[self.front]
+
+
+class SimulatedGame(Game):
+    def __init__(self, swarm=0, scale=1, cornering=0):
+        self.messages = deque()
+        Game.__init__(self, swarm, scale, cornering)
+
+    def show_message(self, text, pos, color, size, time, center):
+        self.messages.append((text, pos, color, size, time, center))
+
+
+class Simulation(threading.Thread):
+    def __init__(self, game, autopilot=None, collector=None, rate=FRAME_REFRESH):
+        super().__init__(daemon=True)
+        self.game = game
+        self.autopilot = autopilot
+        self.collector = collector
+        self.period = 1 / rate
+        self.snapshots = Snapshots()
+        self.snapshots.publish(capture(game))
+        self.commands = deque()
+        self.running = True
+        self.late = 0
+
+    def send(self, name, *args):
+        self.commands.append((name, args))
+
+    def tick(self):
+        game = self.game
+        while self.commands:
+            name, args = self.commands.popleft()
+            getattr(game, name)(*args)
+        if self.autopilot is not None and game.game_state == IN_PLAY:
+            game.steer(self.autopilot.choose(game))
+        game.step(self.period)
+        if self.collector is not None:
+            self.collector.tick()
+        self.snapshots.publish(capture(game))
+
+    def run(self):
+        deadline = time.perf_counter()
+        while self.running:
+            self.tick()
+            deadline += self.period
+            delay = deadline - time.perf_counter()
+            if delay > 0:
+                time.sleep(delay)
+            elif delay < -5 * self.period:
+                self.late += 1
+                deadline = time.perf_counter()
+
+    def stop(self):
+        self.running = False
+        if self.is_alive():
+            self.join()
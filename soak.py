@@ -0,0 +1,122 @@
+import argparse
+import gc
+import random
+import sys
+import tracemalloc
+from collections import Counter
+
+import audio
+from constants import IN_PLAY, LEFT, RIGHT, UP, DOWN
+from game import Game
+
+WARMUP = 5
+MEMORY_LIMIT = 256 * 1024
+COUNT_LIMIT = 200
+
+
+def object_counts():
+    return Counter(type(o).__name__ for o in gc.get_objects())
+
+
+class Soak:
+    def __init__(self, game, seed=0):
+        self.game = game
+        self.rng = random.Random(seed)
+        self.samples = 0
+        self.warmup = WARMUP
+        self.baseline = None
+        self.last = None
+
+    def play_level(self, frames):
+        game = self.game
+        game.game_state = IN_PLAY
+        level = game.level
+        for i in range(frames):
+            if i % 20 == 0:
+                game.steer(self.rng.choice((LEFT, RIGHT, UP, DOWN)))
+            game.step()
+            if game.game_state != IN_PLAY or game.level != level:
+                return
+        for dot in game.scene["Dots"]:
+            dot.visible = False
+        for dot in list(game.scene["Bonus"]):
+            dot.kill()
+        game.dot_map[:] = bytes(len(game.dot_map))
+        game.dots_left = 0
+        while game.level == level and game.game_state == IN_PLAY:
+            game.step()
+
+    def restart(self):
+        self.game.game_state = IN_PLAY
+        self.game.lives = 0
+        self.game.game_ended()
+        self.game.start()
+
+    def sample(self, label):
+        gc.collect()
+        snapshot = tracemalloc.take_snapshot()
+        size = tracemalloc.get_traced_memory()[0]
+        counts = object_counts()
+        self.samples += 1
+        self.last = (size, counts)
+        if self.samples == self.warmup:
+            self.baseline = (snapshot, size, counts)
+        print(f"{label:>12} {size / 1024:10.1f} KiB {sum(counts.values()):8d} objects")
+
+    def run(self, levels, restart_every, frames):
+        self.warmup = max(WARMUP, (levels + 1) // 2)
+        tracemalloc.start()
+        self.sample("start")
+        for n in range(1, levels + 1):
+            self.play_level(frames)
+            if n % restart_every == 0:
+                self.restart()
+                self.sample(f"restart {n}")
+            else:
+                self.sample(f"level {n}")
+        return self.report()
+
+    def report(self):
+        if self.baseline is None:
+            print("not enough transitions to compare")
+            return True
+        snapshot, size, counts = self.baseline
+        last_size, last_counts = self.last
+        ok = True
+        growth = last_size - size
+        print(f"traced memory growth after warm-up: {growth / 1024:.1f} KiB")
+        if growth > MEMORY_LIMIT:
+            ok = False
+            for stat in tracemalloc.take_snapshot().compare_to(snapshot, "lineno")[:10]:
+                print(f"  {stat}")
+        for name, count in (last_counts - counts).most_common():
+            if count > COUNT_LIMIT:
+                ok = False
+                print(f"  {name}: +{count} objects")
+        print("memory flat" if ok else "growth detected")
+        return ok
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--levels", type=int, default=200)
+    parser.add_argument("--restart-every", type=int, default=5)
+    parser.add_argument("--frames", type=int, default=600)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--window", action="store_true")
+    args = parser.parse_args()
+    audio.enabled = False
+    if args.window:
+        from main import GameView
+
+        game = GameView()
+        game.set_visible(False)
+    else:
+        game = Game()
+    soak = Soak(game, args.seed)
+    if not soak.run(args.levels, args.restart_every, args.frames):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
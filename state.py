@@ -0,0 +1,3 @@
+from collections import namedtuple
+
+State = namedtuple("State", "frame state score lives level pacman ghosts dots")
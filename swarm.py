@@ -0,0 +1,66 @@
+import random
+from functools import lru_cache
+
+from constants import GRID_WIDTH, HOLD
+from ghost import Ghost, grid_tile
+from grid import offsets, opposite, tile_exits
+
+SAFE_DISTANCE = 6
+
+
+class Swarm:
+    def __init__(self, layout, world):
+        self.world = world
+        self.top = (world[1] - 40) // GRID_WIDTH
+        self.exits = tile_exits(layout, world[1])
+        self.decide = lru_cache(maxsize=8192)(self.choose_exit)
+
+    def choose_exit(self, tile, direction, target):
+        legal = self.exits.get(tile)
+        if not legal:
+            return direction
+        options = [d for d in legal if d != opposite[direction]] or legal
+        return min(
+            options,
+            key=lambda d: (tile[0] + offsets[d][0] - target[0]) ** 2
+            + (tile[1] + offsets[d][1] - target[1]) ** 2,
+        )
+
+    def spawn(self, count, avoid, rng=random, take=Ghost):
+        tiles = [
+            t
+            for t, exits in self.exits.items()
+            if len(exits) > 1
+            and abs(t[0] - avoid[0]) + abs(t[1] - avoid[1]) > SAFE_DISTANCE
+        ]
+        ghosts = []
+        for i in range(count):
+            tx, ty = rng.choice(tiles)
+            ghost = take(i % 4, tx - 1, self.top - ty, *self.world)
+            if ghost.gtype == Ghost.BLINKY:
+                ghost.center_x += 10
+                ghost.start_position = (ghost.center_x, ghost.center_y)
+            ghost.current_direction = rng.choice(self.exits[(tx, ty)])
+            ghosts.append(ghost)
+        return ghosts
+
+    def step(self, ghosts, pacman):
+        for ghost in ghosts:
+            if ghost.delay > 0:
+                continue
+            ghost.update_target(pacman)
+            if ghost.current_direction == HOLD or ghost.at_tile_centre():
+                tile = grid_tile(ghost.center_x, ghost.center_y)
+                d = self.decide(tile, ghost.current_direction, grid_tile(*ghost.target))
+                if d != ghost.current_direction:
+                    ghost.center_x = tile[0] * GRID_WIDTH
+                    ghost.center_y = tile[1] * GRID_WIDTH
+                    ghost.current_direction = d
+                    ghost.set_direction_image(d)
+            dx, dy = offsets.get(ghost.current_direction, (0, 0))
+            ghost.center_x += dx * ghost.speed
+            ghost.center_y += dy * ghost.speed
+            if ghost.center_x < 2:
+                ghost.center_x = self.world[0] - 22
+            elif ghost.center_x > self.world[0] - 22:
+                ghost.center_x = 2
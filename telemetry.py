@@ -0,0 +1,77 @@
+import queue
+import struct
+import threading
+
+HEADER = b"PACTEL2\n"
+CAPACITY = 4096
+
+START = 0
+DOT = 1
+ENERGISER = 2
+FRUIT = 3
+GHOST_EATEN = 4
+CAUGHT = 5
+MODE = 6
+LEVEL_CLEARED = 7
+GAME_OVER = 8
+
+record = struct.Struct("<BHIhhi")
+formats = {b"PACTEL1\n": struct.Struct("<BBIhhi"), HEADER: record}
+
+
+class Telemetry:
+    def __init__(self, path, capacity=CAPACITY):
+        self.path = path
+        self.capacity = capacity
+        self.buffer = bytearray(capacity * record.size)
+        self.count = 0
+        self.spare = queue.SimpleQueue()
+        self.queue = queue.SimpleQueue()
+        with open(path, "wb") as f:
+            f.write(HEADER)
+        self.writer = threading.Thread(target=self.write_loop, daemon=True)
+        self.writer.start()
+
+    def emit(self, kind, frame, level, x, y, value=0):
+        record.pack_into(
+            self.buffer, self.count * record.size, kind, level, frame, x, y, value
+        )
+        self.count += 1
+        if self.count == self.capacity:
+            self.flush()
+
+    def flush(self):
+        if not self.count:
+            return
+        self.queue.put((self.buffer, self.count))
+        try:
+            self.buffer = self.spare.get_nowait()
+        except queue.Empty:
+            self.buffer = bytearray(self.capacity * record.size)
+        self.count = 0
+
+    def write_loop(self):
+        with open(self.path, "ab") as f:
+            while True:
+                item = self.queue.get()
+                if item is None:
+                    break
+                buffer, count = item
+                f.write(memoryview(buffer)[: count * record.size])
+                f.flush()
+                self.spare.put(buffer)
+
+    def close(self):
+        self.flush()
+        self.queue.put(None)
+        self.writer.join()
+
+
+def read_events(path):
+    with open(path, "rb") as f:
+        layout = formats.get(f.read(len(HEADER)))
+        if layout is None:
+            raise ValueError(f"{path} is not a telemetry file")
+        data = f.read()
+    usable = len(data) - len(data) % layout.size
+    return layout.iter_unpack(data[:usable])